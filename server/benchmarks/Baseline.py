@@ -0,0 +1,66 @@
+import json
+import platform
+import subprocess
+from datetime import datetime, timezone
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except Exception:
+        return None
+
+
+def save_baseline(result, path):
+    """Write a benchmark result as JSON, stamped with the commit and machine it ran on"""
+    document = dict(result, meta={
+        "commit": _git_commit(),
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+    })
+    with open(path, "w") as f:
+        json.dump(document, f, indent=2, sort_keys=True)
+        f.write("\n")
+    return document
+
+
+def load_baseline(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def _change(current, baseline):
+    if current is None or not baseline:
+        return None
+    return (current - baseline) / baseline * 100
+
+
+def compare(result, baseline, threshold=10.0):
+    """
+    Per-scenario deltas against a saved baseline. A scenario regresses when its
+    throughput drops, or its p99 latency grows, by more than threshold percent.
+    Returns (rows, regressed).
+    """
+    rows = []
+    regressed = False
+    for scenario, current in result["scenarios"].items():
+        previous = baseline.get("scenarios", {}).get(scenario)
+        if previous is None:
+            rows.append({"scenario": scenario, "note": "not in baseline"})
+            continue
+        throughput = _change(current["throughput_rps"], previous["throughput_rps"])
+        p99 = _change(current["p99_ms"], previous["p99_ms"])
+        regression = (throughput is not None and throughput < -threshold) or (p99 is not None and p99 > threshold)
+        regressed = regressed or regression
+        rows.append({
+            "scenario": scenario,
+            "throughput_rps": (previous["throughput_rps"], current["throughput_rps"], throughput),
+            "p99_ms": (previous["p99_ms"], current["p99_ms"], p99),
+            "regression": regression,
+        })
+
+    if baseline.get("params") != result.get("params"):
+        print("Warning: baseline was recorded with different parameters; deltas may not be comparable")
+    return rows, regressed
@@ -0,0 +1,113 @@
+import random
+import uuid
+from datetime import datetime, timedelta
+
+from helpers.QRCodeGenerator import generate_team_qr_id, generate_team_join_code
+
+# Share of teams with 1, 2 and 3 members; most teams fill up, some never do
+TEAM_SIZE_WEIGHTS = {1: 0.15, 2: 0.30, 3: 0.55}
+EVENT_POINTS = [10, 20, 25, 50, 100]
+EVENT_POINT_WEIGHTS = [0.35, 0.25, 0.2, 0.15, 0.05]
+EMAIL_DOMAIN = "iiitb.ac.in"
+
+
+def _secret_code(rng):
+    return "".join(rng.choice("ABCDEFGHJKLMNPQRSTUVWXYZ23456789") for _ in range(8))
+
+
+def _uuid(rng):
+    return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+
+
+def generate_dataset(teams=1000, events=20, volunteers=50, seed=42, now=None):
+    """
+    Deterministic synthetic dataset shaped like the documents the routers write.
+    Event popularity follows a Zipf-like curve and every team gets an activity
+    level, so points end up long-tailed like a real leaderboard.
+    Timestamps are relative to now (default: the current UTC time).
+    Returns {"events": [...], "teams": [...], "volunteers": [...]}.
+    """
+    rng = random.Random(seed)
+    now = now or datetime.utcnow()
+
+    event_documents = []
+    for index in range(events):
+        event_documents.append({
+            "event_id": _uuid(rng),
+            "event_name": f"Event {index + 1}",
+            "points": rng.choices(EVENT_POINTS, EVENT_POINT_WEIGHTS)[0],
+            "secret_code": _secret_code(rng),
+            "expired": False,
+            "participants": 0,
+        })
+    popularity = [1 / (rank + 1) ** 0.8 for rank in range(events)]
+
+    team_documents = []
+    student = 0
+    sizes, weights = zip(*TEAM_SIZE_WEIGHTS.items())
+    for index in range(teams):
+        team_id = _uuid(rng)
+        team_name = f"Team {index + 1:05d}"
+        members = []
+        for _ in range(rng.choices(sizes, weights)[0]):
+            student += 1
+            members.append({
+                "name": f"Student {student}",
+                "email": f"student{student}@{EMAIL_DOMAIN}",
+                "rollNumber": f"IMT2024{student:05d}",
+                "role": "participant",
+            })
+
+        activity = rng.betavariate(2, 5)
+        participated = []
+        points = 0
+        for event, weight in zip(event_documents, popularity):
+            if rng.random() < activity * weight:
+                participated.append(event["event_id"])
+                points += event["points"]
+                event["participants"] += 1
+
+        team_documents.append({
+            "team_id": team_id,
+            "team_name": team_name,
+            "qr_id": generate_team_qr_id(team_id),
+            "join_code": generate_team_join_code(team_id, team_name),
+            "members": members,
+            "points": points,
+            "events_participated": participated,
+            "created_at": now - timedelta(minutes=rng.randint(0, 7 * 24 * 60)),
+            "created_by": members[0]["email"],
+        })
+
+    volunteer_documents = [
+        {
+            "rollNumber": f"VOL2024{index:04d}",
+            "name": f"Volunteer {index + 1}",
+            "email": f"volunteer{index + 1}@{EMAIL_DOMAIN}",
+            "added_at": now,
+            "added_by": "benchmark",
+        }
+        for index in range(volunteers)
+    ]
+
+    return {"events": event_documents, "teams": team_documents, "volunteers": volunteer_documents}
+
+
+async def seed_database(db, dataset, reset=False):
+    """
+    Insert a generated dataset through the Database wrapper. Refuses to write into
+    collections that already hold documents unless reset drops them first.
+    """
+    for collection_name in dataset:
+        if reset:
+            await db.db[collection_name].drop()
+            db.invalidate_cache(collection_name)
+        elif await db.exists(collection_name, {}, cache=False):
+            raise RuntimeError(f"Collection '{collection_name}' is not empty; use --reset to drop it first")
+
+    counts = {}
+    for collection_name, documents in dataset.items():
+        result = await db.bulk_add(collection_name, documents)
+        counts[collection_name] = result["counts"].get("inserted", 0)
+    await db.ensure_indexes()
+    return counts
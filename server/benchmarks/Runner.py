@@ -0,0 +1,176 @@
+import asyncio
+import base64
+import json
+import random
+import time
+from collections import Counter
+
+import httpx
+from itsdangerous import TimestampSigner
+
+from config.config import SESSION_SECRET_KEY, SECRET_KEY
+from helpers.SecretCodeEncryptionStrategy import SecretCodeEncryptionStrategy
+
+from .DataGenerator import generate_dataset, seed_database
+
+BASE_URL = "https://testserver"  # the session cookie is https_only
+SCENARIOS = ("scan", "join", "my_team", "events", "leaderboard")
+QUANTILES = (0.5, 0.9, 0.99)
+MAX_SESSIONS = 1000  # signed cookies are prepared up front, not inside the timed loop
+
+
+def session_cookie(user):
+    """Cookie header value Starlette's SessionMiddleware accepts for this user"""
+    data = base64.b64encode(json.dumps({"user": user}).encode())
+    return "session=" + TimestampSigner(str(SESSION_SECRET_KEY)).sign(data).decode()
+
+
+def percentile(samples, q):
+    """Nearest-rank percentile of an already sorted list"""
+    if not samples:
+        return None
+    rank = max(1, min(len(samples), round(q * len(samples) + 0.5)))
+    return samples[rank - 1]
+
+
+def summarize(latencies, statuses, failures, elapsed):
+    """Throughput and exact percentiles (milliseconds) for one scenario run"""
+    latencies = sorted(latencies)
+    count = len(latencies)
+    summary = {
+        "requests": count,
+        "seconds": round(elapsed, 3),
+        "throughput_rps": round(count / elapsed, 1) if elapsed else 0.0,
+        "mean_ms": round(sum(latencies) / count, 3) if count else None,
+        "max_ms": round(latencies[-1], 3) if count else None,
+        "statuses": {str(status): statuses[status] for status in sorted(statuses)},
+        "failures": failures,
+    }
+    for q in QUANTILES:
+        value = percentile(latencies, q)
+        summary[f"p{round(q * 100)}_ms"] = None if value is None else round(value, 3)
+    return summary
+
+
+class Workload:
+    """
+    Builds the requests for each scenario from the seeded dataset. Everything
+    random goes through one seeded generator, so a run is reproducible
+    apart from the interleaving of concurrent requests.
+    """
+    def __init__(self, dataset, seed):
+        self.rng = random.Random(seed)
+        self.teams = dataset["teams"]
+        self.events = dataset["events"]
+        self.members = [dict(member, role="participant") for team in self.teams for member in team["members"]]
+        self.member_sessions = [
+            {"Cookie": session_cookie(member)}
+            for member in self.rng.sample(self.members, min(len(self.members), MAX_SESSIONS))
+        ]
+        self.open_join_codes = [team["join_code"] for team in self.teams if len(team["members"]) < 3]
+        self.scan_tokens = []
+        self._joiners = 0
+
+    async def authorize_volunteers(self, client, volunteers):
+        """Volunteer event tokens are fetched once through /authorize, outside the timed runs"""
+        strategy = SecretCodeEncryptionStrategy(SECRET_KEY)
+        for volunteer, event in zip(volunteers, self.events):
+            user = {"name": volunteer["name"], "email": volunteer["email"],
+                    "rollNumber": volunteer["rollNumber"], "role": "volunteer"}
+            response = await client.post(
+                "/api/volunteer/authorize",
+                json={"event_id": event["event_id"], "secret_code": strategy.encrypt(event["secret_code"])},
+                headers={"Cookie": session_cookie(user)},
+            )
+            response.raise_for_status()
+            self.scan_tokens.append({
+                "Cookie": session_cookie(user),
+                "Authorization": f"Bearer {response.json()['token']}",
+            })
+
+    def request(self, scenario):
+        """(method, url, keyword arguments) for the next request of a scenario"""
+        rng = self.rng
+        if scenario == "scan":
+            team = rng.choice(self.teams)
+            return "POST", "/api/volunteer/scan", {"json": {"team_id": team["qr_id"]},
+                                                   "headers": rng.choice(self.scan_tokens)}
+        if scenario == "join":
+            # Fresh students joining teams that still have room; once a team
+            # fills up the remaining joins are rejected like in production
+            self._joiners += 1
+            user = {"name": f"Joiner {self._joiners}", "email": f"joiner{self._joiners}@iiitb.ac.in",
+                    "rollNumber": f"JOIN{self._joiners:06d}", "role": "participant"}
+            join_code = rng.choice(self.open_join_codes) if self.open_join_codes else "missing"
+            return "POST", "/api/join_team_by_code", {"json": {"join_code": join_code},
+                                                      "headers": {"Cookie": session_cookie(user)}}
+        if scenario == "my_team":
+            return "GET", "/api/my_team", {"headers": rng.choice(self.member_sessions)}
+        if scenario == "events":
+            return "GET", "/api/events", {"headers": rng.choice(self.member_sessions)}
+        if scenario == "leaderboard":
+            return "GET", "/api/leaderboard/full", {"params": {"limit": 50}}
+        raise ValueError(f"Unknown scenario '{scenario}', expected one of: {', '.join(SCENARIOS)}")
+
+
+async def run_scenario(client, workload, scenario, requests, concurrency):
+    """Send requests through concurrency workers pulling from one shared counter"""
+    latencies = []
+    statuses = Counter()
+    failures = 0
+    remaining = iter(range(requests))
+
+    async def worker():
+        nonlocal failures
+        for _ in remaining:
+            method, url, kwargs = workload.request(scenario)
+            started = time.perf_counter()
+            try:
+                response = await client.request(method, url, **kwargs)
+            except Exception:
+                failures += 1
+                continue
+            latencies.append((time.perf_counter() - started) * 1000)
+            statuses[response.status_code] += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(max(1, concurrency))))
+    return summarize(latencies, statuses, failures, time.perf_counter() - started)
+
+
+async def run_benchmark(app, teams=1000, events=20, volunteers=50, requests=500, concurrency=10,
+                        scenarios=SCENARIOS, seed=42, warmup=20, reset=False):
+    """
+    Seed the app's database with a synthetic dataset, then drive each scenario
+    in process through the ASGI app (no sockets). Returns a baseline document.
+    """
+    unknown = [scenario for scenario in scenarios if scenario not in SCENARIOS]
+    if unknown:
+        raise ValueError(f"Unknown scenario '{unknown[0]}', expected one of: {', '.join(SCENARIOS)}")
+    if "scan" in scenarios and not (events and volunteers):
+        raise ValueError("The scan scenario needs at least one event and one volunteer")
+
+    dataset = generate_dataset(teams=teams, events=events, volunteers=volunteers, seed=seed)
+    results = {}
+    async with app.router.lifespan_context(app):
+        db = app.state.db
+        seeded = await seed_database(db, dataset, reset=reset)
+        await app.state.leaderboard.load(db)
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url=BASE_URL) as client:
+            workload = Workload(dataset, seed)
+            await workload.authorize_volunteers(client, dataset["volunteers"])
+            for scenario in scenarios:
+                if warmup:
+                    await run_scenario(client, workload, scenario, warmup, concurrency)
+                results[scenario] = await run_scenario(client, workload, scenario, requests, concurrency)
+
+    return {
+        "params": {
+            "teams": teams, "events": events, "volunteers": volunteers, "requests": requests,
+            "concurrency": concurrency, "seed": seed, "warmup": warmup, "backend": db.backend.scheme,
+        },
+        "seeded": seeded,
+        "scenarios": results,
+    }
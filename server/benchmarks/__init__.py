@@ -0,0 +1,26 @@
+"""
+In-process API benchmarks. The app is driven through its ASGI interface with a
+synthetic dataset, against the in-memory engine unless MONGO_URI says otherwise.
+Settings the app refuses to start without get throwaway values here; a
+benchmark never talks to Microsoft login.
+"""
+import os
+
+os.environ.setdefault("MONGO_URI", "memory://")
+os.environ.setdefault("DATABASE_NAME", "benchmark")
+for _name in ("CLIENT_ID", "CLIENT_SECRET", "TENANT_ID", "SESSION_SECRET_KEY", "SECRET_KEY"):
+    os.environ.setdefault(_name, "benchmark")
+
+from .DataGenerator import generate_dataset, seed_database
+from .Runner import run_benchmark, SCENARIOS
+from .Baseline import save_baseline, load_baseline, compare
+
+__all__ = [
+    'generate_dataset',
+    'seed_database',
+    'run_benchmark',
+    'SCENARIOS',
+    'save_baseline',
+    'load_baseline',
+    'compare',
+]
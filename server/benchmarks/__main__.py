@@ -0,0 +1,94 @@
+"""
+Usage (from the server/ directory):
+
+    python -m benchmarks --teams 2000 --events 30 --requests 1000 --concurrency 20 --save baseline.json
+    python -m benchmarks --teams 2000 --events 30 --requests 1000 --concurrency 20 --compare baseline.json
+
+--compare exits with status 1 when any scenario regressed by more than --threshold percent.
+"""
+import argparse
+import asyncio
+import contextlib
+import os
+import sys
+
+from . import SCENARIOS, run_benchmark, save_baseline, load_baseline, compare
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="In-process API benchmark")
+    parser.add_argument("--teams", type=int, default=1000, help="synthetic teams to seed")
+    parser.add_argument("--events", type=int, default=20, help="synthetic events to seed")
+    parser.add_argument("--volunteers", type=int, default=50, help="synthetic volunteers to seed")
+    parser.add_argument("--requests", type=int, default=500, help="timed requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=10, help="concurrent in-flight requests")
+    parser.add_argument("--warmup", type=int, default=20, help="untimed requests per scenario")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS),
+                        help=f"comma separated subset of: {', '.join(SCENARIOS)}")
+    parser.add_argument("--seed", type=int, default=42, help="seed for data generation and request mix")
+    parser.add_argument("--reset", action="store_true", help="drop the seeded collections first (non-memory databases)")
+    parser.add_argument("--save", metavar="PATH", help="write the result as a JSON baseline")
+    parser.add_argument("--compare", metavar="PATH", help="compare against a saved JSON baseline")
+    parser.add_argument("--threshold", type=float, default=10.0, help="regression threshold in percent")
+    parser.add_argument("--verbose", action="store_true", help="keep the app's own log output")
+    return parser.parse_args(argv)
+
+
+def _format(value, suffix=""):
+    return "-" if value is None else f"{value:,.1f}{suffix}"
+
+
+def print_results(result):
+    print(f"{'scenario':<12} {'req/s':>10} {'p50 ms':>9} {'p90 ms':>9} {'p99 ms':>9} {'max ms':>9}  statuses")
+    for scenario, summary in result["scenarios"].items():
+        statuses = " ".join(f"{status}:{count}" for status, count in summary["statuses"].items())
+        if summary["failures"]:
+            statuses += f" failed:{summary['failures']}"
+        print(f"{scenario:<12} {_format(summary['throughput_rps']):>10} {_format(summary['p50_ms']):>9} "
+              f"{_format(summary['p90_ms']):>9} {_format(summary['p99_ms']):>9} {_format(summary['max_ms']):>9}  {statuses}")
+
+
+def print_comparison(rows):
+    print(f"{'scenario':<12} {'req/s (base -> now)':>26} {'p99 ms (base -> now)':>26}")
+    for row in rows:
+        if "note" in row:
+            print(f"{row['scenario']:<12} {row['note']}")
+            continue
+        cells = []
+        for previous, current, change in (row["throughput_rps"], row["p99_ms"]):
+            cells.append(f"{_format(previous)} -> {_format(current)} ({_format(change, '%')})")
+        flag = "  REGRESSION" if row["regression"] else ""
+        print(f"{row['scenario']:<12} {cells[0]:>26} {cells[1]:>26}{flag}")
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    scenarios = [scenario.strip() for scenario in args.scenarios.split(",") if scenario.strip()]
+
+    from main import app
+
+    print(f"Seeding {args.teams} teams, {args.events} events, {args.volunteers} volunteers (seed {args.seed}); "
+          f"{args.requests} requests per scenario at concurrency {args.concurrency}")
+    # The app logs on every request; that would swamp the report and the terminal
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(sys.stdout if args.verbose else devnull):
+        result = asyncio.run(run_benchmark(
+            app, teams=args.teams, events=args.events, volunteers=args.volunteers, requests=args.requests,
+            concurrency=args.concurrency, scenarios=scenarios, seed=args.seed, warmup=args.warmup, reset=args.reset,
+        ))
+    print_results(result)
+
+    if args.save:
+        save_baseline(result, args.save)
+        print(f"Baseline saved to {args.save}")
+
+    if args.compare:
+        rows, regressed = compare(result, load_baseline(args.compare), threshold=args.threshold)
+        print_comparison(rows)
+        if regressed:
+            print(f"Regression above {args.threshold}% against {args.compare}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
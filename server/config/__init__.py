@@ -3,6 +3,15 @@ from .config import *
 __all__ = [
     'CLIENT_ID', 'CLIENT_SECRET', 'TENANT_ID', 'SESSION_SECRET_KEY',
     'ADMIN_EMAIL', 'FRONTEND_URL', 'BACKEND_URL',
-    'MONGODB_USERNAME', 'MONGODB_PASSWORD', 'CLUSTER_NAME',
-    'DATABASE_NAME', 'APP_NAME', 'DEADLINE_DATE', 'SECRET_KEY'
+    'MONGO_URI', 'MONGODB_USERNAME', 'MONGODB_PASSWORD', 'CLUSTER_NAME',
+    'DATABASE_NAME', 'APP_NAME', 'DEADLINE_DATE', 'SECRET_KEY',
+    'MONGO_MAX_POOL_SIZE', 'MONGO_MIN_POOL_SIZE', 'MONGO_MAX_CONNECTING',
+    'MONGO_WAIT_QUEUE_TIMEOUT_MS', 'MONGO_SERVER_SELECTION_TIMEOUT_MS', 'MONGO_COMPRESSORS',
+    'MONGO_SECONDARY_READS', 'MONGO_SECONDARY_MAX_STALENESS_SECONDS',
+    'EVENT_CACHE_TTL_SECONDS', 'EVENT_CACHE_MAX_ENTRIES', 'VOLUNTEER_TOKEN_CACHE_SIZE',
+    'LEADERBOARD_RESYNC_SECONDS', 'LEADERBOARD_STREAM_MAX_CLIENTS',
+    'LEADERBOARD_STREAM_QUEUE_SIZE', 'LEADERBOARD_STREAM_HEARTBEAT_SECONDS',
+    'COUNTER_FLUSH_SECONDS', 'COUNTER_FLUSH_BATCH_SIZE',
+    'IDEMPOTENCY_STORE', 'IDEMPOTENCY_TTL_SECONDS', 'IDEMPOTENCY_MAX_ENTRIES',
+    'QUERY_CACHE_ENABLED', 'SLOW_QUERY_MS', 'METRICS_TOKEN'
 ]
@@ -11,11 +11,47 @@ ADMIN_EMAIL = config("ADMIN_EMAIL", default="synergy@iiitb.ac.in")
 FRONTEND_URL = config("FRONTEND_URL", default="http://localhost:5173")
 BACKEND_URL = config("BACKEND_URL", default="http://localhost:8000")
 
-MONGODB_USERNAME = config("MONGODB_USERNAME")
-MONGODB_PASSWORD = config("MONGODB_PASSWORD")
-CLUSTER_NAME = config("CLUSTER_NAME")
+# Either a full MONGO_URI (mongodb://, mongodb+srv:// or memory://) or the Atlas parts below
+MONGO_URI = config("MONGO_URI", default=None)
+MONGODB_USERNAME = config("MONGODB_USERNAME", default=None)
+MONGODB_PASSWORD = config("MONGODB_PASSWORD", default=None)
+CLUSTER_NAME = config("CLUSTER_NAME", default=None)
 DATABASE_NAME = config("DATABASE_NAME")
-APP_NAME = config("APP_NAME")
+APP_NAME = config("APP_NAME", default=None)
 DEADLINE_DATE = config("DEADLINE_DATE", default=None)
 
-SECRET_KEY = config("SECRET_KEY")
\ No newline at end of file
+SECRET_KEY = config("SECRET_KEY")
+
+MONGO_MAX_POOL_SIZE = config("MONGO_MAX_POOL_SIZE", cast=int, default=100)
+MONGO_MIN_POOL_SIZE = config("MONGO_MIN_POOL_SIZE", cast=int, default=0)
+MONGO_MAX_CONNECTING = config("MONGO_MAX_CONNECTING", cast=int, default=2)
+MONGO_WAIT_QUEUE_TIMEOUT_MS = config("MONGO_WAIT_QUEUE_TIMEOUT_MS", cast=int, default=None)
+MONGO_SERVER_SELECTION_TIMEOUT_MS = config("MONGO_SERVER_SELECTION_TIMEOUT_MS", cast=int, default=30000)
+MONGO_COMPRESSORS = config("MONGO_COMPRESSORS", default="")
+MONGO_SECONDARY_READS = config("MONGO_SECONDARY_READS", cast=bool, default=True)
+MONGO_SECONDARY_MAX_STALENESS_SECONDS = config("MONGO_SECONDARY_MAX_STALENESS_SECONDS", cast=int, default=120)
+
+EVENT_CACHE_TTL_SECONDS = config("EVENT_CACHE_TTL_SECONDS", cast=float, default=30)
+EVENT_CACHE_MAX_ENTRIES = config("EVENT_CACHE_MAX_ENTRIES", cast=int, default=512)
+VOLUNTEER_TOKEN_CACHE_SIZE = config("VOLUNTEER_TOKEN_CACHE_SIZE", cast=int, default=4096)
+
+LEADERBOARD_RESYNC_SECONDS = config("LEADERBOARD_RESYNC_SECONDS", cast=float, default=60)
+LEADERBOARD_STREAM_MAX_CLIENTS = config("LEADERBOARD_STREAM_MAX_CLIENTS", cast=int, default=1000)
+LEADERBOARD_STREAM_QUEUE_SIZE = config("LEADERBOARD_STREAM_QUEUE_SIZE", cast=int, default=64)
+LEADERBOARD_STREAM_HEARTBEAT_SECONDS = config("LEADERBOARD_STREAM_HEARTBEAT_SECONDS", cast=float, default=15)
+
+# Event participant counters are buffered and written in bulk at most this often,
+# or as soon as this many events have pending increments
+COUNTER_FLUSH_SECONDS = config("COUNTER_FLUSH_SECONDS", cast=float, default=1)
+COUNTER_FLUSH_BATCH_SIZE = config("COUNTER_FLUSH_BATCH_SIZE", cast=int, default=100)
+
+# Responses to requests carrying an Idempotency-Key are replayed for this long.
+# "memory" keeps them per worker; "mongo" shares them through a TTL-indexed collection
+IDEMPOTENCY_STORE = config("IDEMPOTENCY_STORE", default="memory")
+IDEMPOTENCY_TTL_SECONDS = config("IDEMPOTENCY_TTL_SECONDS", cast=int, default=86400)
+IDEMPOTENCY_MAX_ENTRIES = config("IDEMPOTENCY_MAX_ENTRIES", cast=int, default=10000)
+
+QUERY_CACHE_ENABLED = config("QUERY_CACHE_ENABLED", cast=bool, default=True)
+
+SLOW_QUERY_MS = config("SLOW_QUERY_MS", cast=float, default=100)
+METRICS_TOKEN = config("METRICS_TOKEN", default=None)
@@ -0,0 +1,152 @@
+import asyncio
+
+from fastapi import Request
+
+from config.config import COUNTER_FLUSH_SECONDS, COUNTER_FLUSH_BATCH_SIZE
+
+# Flushes attempted on shutdown before pending increments are given up
+DRAIN_ATTEMPTS = 3
+
+
+def get_participant_counter(request: Request):
+    """Dependency to get the event participant counter buffer from app state"""
+    return request.app.state.participant_counter
+
+
+class CounterBuffer:
+    """
+    Write-behind buffer for counter fields. Increments are coalesced per key in
+    memory and written with one unordered bulk_write of $inc updates, every
+    flush_interval seconds or as soon as batch_size keys are pending, instead of
+    one update per increment on the same hot document.
+
+    A flush swaps the pending counts out first, so increments arriving while it
+    runs are kept for the next one. Increments whose update fails are added back
+    and retried on the next flush, so no count is lost. Counts are only
+    approximate while buffered: readers see the persisted value for up to
+    flush_interval seconds.
+    """
+    def __init__(self, collection_name, key_field, field, flush_interval=COUNTER_FLUSH_SECONDS,
+                 batch_size=COUNTER_FLUSH_BATCH_SIZE):
+        self.collection_name = collection_name
+        self.key_field = key_field
+        self.field = field
+        self.flush_interval = flush_interval
+        self.batch_size = max(1, batch_size)
+        self._pending = {}
+        self._lock = asyncio.Lock()
+        self._wakeup = asyncio.Event()
+        self._closing = False
+        self._task = None
+        self.flushes = 0
+        self.flush_failures = 0
+        self.increments_written = 0
+        self.updates_written = 0
+
+    def __len__(self):
+        return len(self._pending)
+
+    def add(self, key, amount=1):
+        """Buffer an increment; wakes the flusher early once batch_size keys are pending"""
+        if not amount:
+            return
+        self._pending[key] = self._pending.get(key, 0) + amount
+        if len(self._pending) >= self.batch_size:
+            self._wakeup.set()
+
+    def pending(self, key=None):
+        """Buffered, not yet written increments for one key, or for all keys"""
+        if key is None:
+            return sum(self._pending.values())
+        return self._pending.get(key, 0)
+
+    def _restore(self, counts):
+        for key, amount in counts.items():
+            self._pending[key] = self._pending.get(key, 0) + amount
+
+    async def flush(self, db):
+        """Write everything pending; returns the number of increments persisted"""
+        async with self._lock:
+            if not self._pending:
+                return 0
+            batch, self._pending = self._pending, {}
+            self._wakeup.clear()
+
+            written = {}
+            keys = list(batch)
+            try:
+                for start in range(0, len(keys), self.batch_size):
+                    chunk = keys[start:start + self.batch_size]
+                    result = await db.bulk_update(self.collection_name, [
+                        ({self.key_field: key}, {"$inc": {self.field: batch[key]}})
+                        for key in chunk
+                    ])
+                    for row in result["results"]:
+                        key = chunk[row["index"]]
+                        if row["status"] != "failed":
+                            written[key] = batch.pop(key)
+            except Exception as e:
+                print(f"Flushing {self.collection_name}.{self.field} counters failed: {e}")
+            finally:
+                # Whatever was not confirmed goes back to pending for the next flush
+                self._restore(batch)
+
+            self.flushes += 1
+            if batch:
+                self.flush_failures += 1
+            self.increments_written += sum(written.values())
+            self.updates_written += len(written)
+
+        return sum(written.values())
+
+    async def run(self, db):
+        """Flush every flush_interval seconds, or sooner when a batch fills up, until close()"""
+        while not self._closing:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            if self._closing:
+                break
+            failures = self.flush_failures
+            try:
+                await self.flush(db)
+            except Exception as e:
+                print(f"Counter flush failed: {e}")
+            if self.flush_failures != failures:
+                # Back off rather than retrying a failing database on every filled batch
+                await asyncio.sleep(self.flush_interval)
+
+    def start(self, db):
+        self._task = asyncio.create_task(self.run(db))
+        return self._task
+
+    async def close(self, db, attempts=DRAIN_ATTEMPTS):
+        """
+        Stop the flusher and drain what is pending. The flusher is not cancelled
+        mid-write, since a write that lands after cancellation would be counted
+        twice once its increments are restored and drained.
+        """
+        self._closing = True
+        self._wakeup.set()
+        if self._task is not None:
+            await self._task
+            self._task = None
+
+        for _ in range(attempts):
+            await self.flush(db)
+            if not self._pending:
+                return True
+        print(f"Could not persist {self.pending()} buffered {self.collection_name}.{self.field} increments: "
+              f"{self._pending}")
+        return False
+
+    def stats(self):
+        return {
+            "pending_keys": len(self._pending),
+            "pending_increments": self.pending(),
+            "flushes": self.flushes,
+            "flush_failures": self.flush_failures,
+            "increments_written": self.increments_written,
+            "updates_written": self.updates_written,
+        }
@@ -1,31 +1,287 @@
+import copy
+import importlib.util
+import json
 import socket
-from motor.motor_asyncio import AsyncIOMotorClient
+import time
+from pymongo import IndexModel, ASCENDING, DESCENDING, ReturnDocument, InsertOne, UpdateOne
+from pymongo.read_preferences import Primary, SecondaryPreferred
+from pymongo.read_concern import ReadConcern
+from pymongo.errors import PyMongoError, ConnectionFailure, ConfigurationError, BulkWriteError
 from fastapi import Request
 
-from config.config import MONGODB_USERNAME, MONGODB_PASSWORD, CLUSTER_NAME, APP_NAME, DATABASE_NAME
-from helpers.DateTimeSerializer import DateTimeSerializerVisitor
+from config.config import (
+    MONGO_URI, MONGODB_USERNAME, MONGODB_PASSWORD, CLUSTER_NAME, APP_NAME, DATABASE_NAME, QUERY_CACHE_ENABLED,
+    MONGO_MAX_POOL_SIZE, MONGO_MIN_POOL_SIZE, MONGO_MAX_CONNECTING, MONGO_WAIT_QUEUE_TIMEOUT_MS,
+    MONGO_SERVER_SELECTION_TIMEOUT_MS, MONGO_COMPRESSORS, MONGO_SECONDARY_READS, MONGO_SECONDARY_MAX_STALENESS_SECONDS,
+    IDEMPOTENCY_TTL_SECONDS
+)
+from helpers.TTLCache import TTLCache
+from helpers.BulkImport import count_statuses
+from .QueryMetrics import QueryMetrics, InstrumentedCollection, document_size
+from .PoolMonitor import PoolMonitor
+from .StorageBackend import create_backend
 
 def get_db(request: Request):
     """Dependency to get database instance from app state"""
     return request.app.state.db
 
+
+# Declarative index registry applied on startup by Database.ensure_indexes().
+# Every hot lookup in the routers must be covered here; index names are fixed
+# so that drift between this registry and the cluster can be reported.
+INDEX_REGISTRY = {
+    "teams": [
+        IndexModel([("team_id", ASCENDING)], name="team_id_unique", unique=True),
+        IndexModel([("qr_id", ASCENDING)], name="qr_id_unique", unique=True,
+                   partialFilterExpression={"qr_id": {"$exists": True}}),
+        IndexModel([("join_code", ASCENDING)], name="join_code_unique", unique=True,
+                   partialFilterExpression={"join_code": {"$exists": True}}),
+        IndexModel([("team_name", ASCENDING)], name="team_name_unique", unique=True,
+                   partialFilterExpression={"team_name": {"$exists": True}}),
+        # A user may belong to at most one team
+        IndexModel([("members.email", ASCENDING)], name="member_email_unique", unique=True,
+                   partialFilterExpression={"members.email": {"$exists": True}}),
+        # Leaderboard order and keyset pagination cursor: (points desc, _id asc)
+        IndexModel([("points", DESCENDING), ("_id", ASCENDING)], name="points_desc_id"),
+    ],
+    "events": [
+        IndexModel([("event_id", ASCENDING)], name="event_id_unique", unique=True),
+    ],
+    "volunteers": [
+        IndexModel([("rollNumber", ASCENDING)], name="roll_number_unique", unique=True),
+        IndexModel([("email", ASCENDING)], name="volunteer_email_unique", unique=True,
+                   partialFilterExpression={"email": {"$exists": True}}),
+    ],
+    # Stored Idempotency-Key responses (IDEMPOTENCY_STORE=mongo), removed by the TTL monitor
+    "idempotency_keys": [
+        IndexModel([("created_at", ASCENDING)], name="created_at_ttl", expireAfterSeconds=IDEMPOTENCY_TTL_SECONDS),
+    ],
+}
+
+# Read-through cache policy per collection for find_one/find_many. Any write through
+# the Database wrapper clears the cache of the collection it touched; the TTL bounds
+# staleness caused by writes from other workers. find_one and exists misses are not
+# cached, so documents inserted elsewhere are found immediately.
+QUERY_CACHE_POLICIES = {
+    "events": {"ttl_seconds": 30, "max_entries": 256},
+    "volunteers": {"ttl_seconds": 30, "max_entries": 512},
+    "teams": {"ttl_seconds": 5, "max_entries": 4096},
+    "resource_versions": {"ttl_seconds": 2, "max_entries": 64},
+}
+
+# Every write through the wrapper to one of these collections also bumps a
+# version counter document shared by all workers, which list endpoints turn
+# into an ETag without reading the list itself (see Database.version)
+RESOURCE_VERSIONS_COLLECTION = "resource_versions"
+VERSIONED_COLLECTIONS = frozenset({"events"})
+
+# MongoDB rejects maxStalenessSeconds below 90
+MIN_MAX_STALENESS_SECONDS = 90
+
+
+def read_profiles(secondary_reads=MONGO_SECONDARY_READS, max_staleness=MONGO_SECONDARY_MAX_STALENESS_SECONDS):
+    """
+    Named read routes: (read preference, read concern) per profile.
+    "primary" is the driver default and is used by everything that must see its
+    own writes (scans, joins, authorize, and the event and volunteer lists when
+    an admin reads them). "secondary" is for the lists everyone else polls and
+    for leaderboard reloads, which tolerate replication lag up to max_staleness
+    seconds.
+    With secondary reads disabled both profiles go to the primary.
+    """
+    if max_staleness < MIN_MAX_STALENESS_SECONDS:
+        print(f"MONGO_SECONDARY_MAX_STALENESS_SECONDS={max_staleness} is below the MongoDB minimum, using {MIN_MAX_STALENESS_SECONDS}")
+        max_staleness = MIN_MAX_STALENESS_SECONDS
+    secondary = (SecondaryPreferred(max_staleness=max_staleness), ReadConcern("local")) if secondary_reads else (Primary(), None)
+    return {
+        "primary": (Primary(), None),
+        "secondary": secondary,
+    }
+
+
+_MISSING = object()
+
+
+def _tagged(value):
+    """Encode non-JSON query values with their type, so ObjectId("...") and "..." get different cache keys"""
+    return {f"${type(value).__name__}": str(value)}
+
+# Operations per bulk_write round trip for the bulk_* helpers
+BULK_CHUNK_SIZE = 500
+
+# Index options that are compared when checking for drift
+INDEX_OPTIONS = ("unique", "sparse", "partialFilterExpression", "expireAfterSeconds")
+
+
+# Optional packages needed by the wire protocol compressors (zlib is built in)
+COMPRESSOR_MODULES = {"zstd": "zstandard", "snappy": "snappy", "zlib": None}
+
+
+def _available_compressors(names):
+    """Keep the configured compressors whose optional package is installed, in order"""
+    available = []
+    for name in (name.strip().lower() for name in names.split(",")):
+        if not name:
+            continue
+        if name not in COMPRESSOR_MODULES:
+            print(f"Unknown MongoDB compressor '{name}' ignored")
+            continue
+        module = COMPRESSOR_MODULES[name]
+        if module is not None and importlib.util.find_spec(module) is None:
+            print(f"MongoDB compressor '{name}' needs the '{module}' package, skipping it")
+            continue
+        available.append(name)
+    return available
+
+
+def pool_options():
+    """Motor client keyword arguments built from the MONGO_* settings"""
+    options = {
+        "maxPoolSize": MONGO_MAX_POOL_SIZE,
+        "minPoolSize": MONGO_MIN_POOL_SIZE,
+        "maxConnecting": MONGO_MAX_CONNECTING,
+        "serverSelectionTimeoutMS": MONGO_SERVER_SELECTION_TIMEOUT_MS,
+    }
+    if MONGO_WAIT_QUEUE_TIMEOUT_MS:
+        options["waitQueueTimeoutMS"] = MONGO_WAIT_QUEUE_TIMEOUT_MS
+    compressors = _available_compressors(MONGO_COMPRESSORS)
+    if compressors:
+        options["compressors"] = compressors
+    return options
+
+
+def atlas_uri():
+    """Atlas connection string assembled from MONGODB_USERNAME, MONGODB_PASSWORD, CLUSTER_NAME and APP_NAME"""
+    if not (MONGODB_USERNAME and MONGODB_PASSWORD and CLUSTER_NAME):
+        raise ValueError("Set MONGO_URI, or MONGODB_USERNAME, MONGODB_PASSWORD and CLUSTER_NAME")
+    return f"mongodb+srv://{MONGODB_USERNAME}:{MONGODB_PASSWORD}@{CLUSTER_NAME}.mongodb.net/?retryWrites=true&w=majority&appName={APP_NAME}"
+
+
+def _index_signature(spec):
+    """Normalize an index description (registry or server) for comparison"""
+    key = [(field, int(direction) if isinstance(direction, (int, float)) else direction)
+           for field, direction in dict(spec["key"]).items()]
+    options = {option: spec[option] for option in INDEX_OPTIONS if spec.get(option) not in (None, False)}
+    return key, options
+
+
 class Database:
-    def __init__(self):
-        self.MONGO_URI = f"mongodb+srv://{MONGODB_USERNAME}:{MONGODB_PASSWORD}@{CLUSTER_NAME}.mongodb.net/?retryWrites=true&w=majority&appName={APP_NAME}"
+    def __init__(self, cache_policies=None, read_routing=None, uri=None):
+        self.MONGO_URI = uri or MONGO_URI or atlas_uri()
+        self.backend = create_backend(self.MONGO_URI)
         self.client = None
         self.db = None
+
+        if cache_policies is None:
+            cache_policies = QUERY_CACHE_POLICIES if QUERY_CACHE_ENABLED else {}
+        self._query_caches = {
+            collection_name: TTLCache(max_entries=policy["max_entries"], ttl_seconds=policy["ttl_seconds"])
+            for collection_name, policy in cache_policies.items()
+        }
+        # Bumped on every write so that reads racing a write never populate the cache
+        self._cache_generations = {collection_name: 0 for collection_name in cache_policies}
+        # Highest shared version seen per versioned collection
+        self._seen_versions = {}
+        # Registry indexes (collection.name) that ensure_indexes could not confirm are in place
+        self.unenforced_indexes = set()
+        self.metrics = QueryMetrics()
+        self._read_profiles = read_profiles()
+        # Default read profile per collection; reads not listed go to the primary
+        self._read_routing = read_routing or {}
+        self._read_collections = {}
+        self.pool_monitor = PoolMonitor()
     
     def connect(self):
-        self.client = AsyncIOMotorClient(self.MONGO_URI)
+        # minPoolSize > 0 makes the driver open connections in the background before the first request
+        self.client = self.backend.create_client(event_listeners=[self.pool_monitor], **pool_options())
         self.db = self.client[DATABASE_NAME]
-        print(f"Connected to MongoDB at {self.MONGO_URI} on host {socket.gethostname()}")
-        
-    def serializer(self, obj):
-        visitor = DateTimeSerializerVisitor()
-        return visitor.visit(obj)
+        print(f"Connected to MongoDB at {self.backend.describe()} on host {socket.gethostname()}")
         
+    def _reader(self, collection_name, read=None):
+        """
+        Collection handle for a read routed by profile name; falls back to the
+        collection's default profile and then to the primary.
+        """
+        read = read or self._read_routing.get(collection_name, "primary")
+        if read == "primary":
+            return self.db[collection_name]
+        key = (collection_name, read)
+        collection = self._read_collections.get(key)
+        if collection is None:
+            if read not in self._read_profiles:
+                raise ValueError(f"Unknown read profile: {read}")
+            read_preference, read_concern = self._read_profiles[read]
+            collection = self._read_collections[key] = self.db[collection_name].with_options(
+                read_preference=read_preference, read_concern=read_concern
+            )
+        return collection
+
+    @staticmethod
+    def _cache_key(operation, query, projection=None, sort=None, limit=None):
+        """Normalized cache key; dict key order is irrelevant to MongoDB except for sort"""
+        return json.dumps([operation, query, projection, sort, limit], sort_keys=True, default=_tagged)
+
+    def _cache_get(self, collection_name, key):
+        cache = self._query_caches.get(collection_name)
+        if cache is None:
+            return _MISSING
+        value = cache.get(key, _MISSING)
+        # Callers are free to mutate what they get back
+        return value if value is _MISSING else copy.deepcopy(value)
+
+    def _cache_set(self, collection_name, key, value, generation):
+        cache = self._query_caches.get(collection_name)
+        if cache is not None and self._cache_generations[collection_name] == generation:
+            cache.set(key, copy.deepcopy(value))
+
+    def invalidate_cache(self, collection_name):
+        cache = self._query_caches.get(collection_name)
+        if cache is not None:
+            self._cache_generations[collection_name] += 1
+            cache.clear()
+
+    async def _write(self, collection_name, operation):
+        """Await a write and invalidate the collection's cache, even if it failed part way"""
+        try:
+            return await operation
+        finally:
+            self.invalidate_cache(collection_name)
+            if collection_name in VERSIONED_COLLECTIONS:
+                await self._bump_version(collection_name)
+
+    async def _bump_version(self, resource):
+        collection = self.db[RESOURCE_VERSIONS_COLLECTION]
+        try:
+            with self.metrics.track(RESOURCE_VERSIONS_COLLECTION, "update_one", {"_id": resource}):
+                await collection.update_one({"_id": resource}, {"$inc": {"version": 1}}, upsert=True)
+        except Exception as e:
+            # The write itself went through; clients just keep their tag until the next bump
+            print(f"Could not bump the {resource} version: {e}")
+        finally:
+            self.invalidate_cache(RESOURCE_VERSIONS_COLLECTION)
+
+    async def version(self, resource, read=None):
+        """
+        Shared version counter of a versioned collection, read through the
+        short-lived query cache. A version newer than any seen before means
+        another worker wrote, so this worker's cached reads of the collection
+        are dropped rather than served under the new version.
+        """
+        document = await self.find_one(RESOURCE_VERSIONS_COLLECTION, {"_id": resource}, read=read)
+        version = document["version"] if document else 0
+        if version > self._seen_versions.get(resource, 0):
+            self._seen_versions[resource] = version
+            self.invalidate_cache(resource)
+        return version
+
+    def cache_stats(self):
+        return {collection_name: cache.stats() for collection_name, cache in self._query_caches.items()}
+
     def check_connection(self):
-        hostname = f"{CLUSTER_NAME}.mongodb.net"
+        """Diagnose DNS problems up front; only mongodb+srv:// URIs depend on SRV lookups"""
+        hostname = self.backend.srv_host
+        if hostname is None:
+            return
         print(f"Testing DNS resolution for: {hostname}")
         dns_success = False
 
@@ -51,17 +307,113 @@ class Database:
             print("4. Verify the cluster name in MongoDB Atlas dashboard")
             print("\n  Continuing without DNS verification - connection may still work...")
     
+    async def ensure_indexes(self, registry=None):
+        """
+        Create every index declared in the registry that is missing on the cluster.
+        Indexes that exist with different keys/options and indexes that are not
+        in the registry are reported as drift but never dropped automatically.
+        """
+        registry = INDEX_REGISTRY if registry is None else registry
+        report = {"created": [], "existing": [], "conflicts": [], "unmanaged": [], "failed": []}
+
+        for collection_name, models in registry.items():
+            collection = self.db[collection_name]
+            try:
+                existing = await collection.index_information()
+            except (ConnectionFailure, ConfigurationError) as e:
+                # The cluster is unreachable, there is no point in trying the other collections
+                report["failed"].append({"collection": collection_name, "error": str(e)})
+                print(f"Index bootstrap aborted, database unreachable: {e}")
+                break
+            except PyMongoError as e:
+                report["failed"].append({"collection": collection_name, "error": str(e)})
+                continue
+
+            existing_by_key = {}
+            for name, info in existing.items():
+                key, _ = _index_signature(info)
+                existing_by_key[tuple(key)] = name
+
+            to_create = []
+            declared_names = set()
+            renamed = set()
+            for model in models:
+                spec = model.document
+                name = spec["name"]
+                declared_names.add(name)
+                key, options = _index_signature(spec)
+                qualified_name = f"{collection_name}.{name}"
+
+                if name in existing:
+                    existing_key, existing_options = _index_signature(existing[name])
+                    if existing_key != key or existing_options != options:
+                        report["conflicts"].append({
+                            "index": qualified_name,
+                            "expected": {"key": key, **options},
+                            "actual": {"key": existing_key, **existing_options},
+                        })
+                    else:
+                        report["existing"].append(qualified_name)
+                elif tuple(key) in existing_by_key:
+                    # Same key pattern under another name; creating it again would fail
+                    renamed.add(existing_by_key[tuple(key)])
+                    report["conflicts"].append({
+                        "index": qualified_name,
+                        "expected": {"key": key, **options},
+                        "actual": {"name": existing_by_key[tuple(key)]},
+                    })
+                else:
+                    to_create.append(model)
+
+            for name in existing:
+                if name != "_id_" and name not in declared_names and name not in renamed:
+                    report["unmanaged"].append(f"{collection_name}.{name}")
+
+            for model in to_create:
+                qualified_name = f"{collection_name}.{model.document['name']}"
+                try:
+                    await collection.create_indexes([model])
+                    report["created"].append(qualified_name)
+                except PyMongoError as e:
+                    # e.g. existing duplicates violate a unique index
+                    report["failed"].append({"index": qualified_name, "error": str(e)})
+
+        for name in report["created"]:
+            print(f"Index built: {name}")
+        for conflict in report["conflicts"]:
+            print(f"Index drift: {conflict['index']} expected {conflict['expected']} but found {conflict['actual']}")
+        for name in report["unmanaged"]:
+            print(f"Index drift: {name} exists on the cluster but is not in the registry")
+        for failure in report["failed"]:
+            print(f"Index build failed: {failure.get('index', failure.get('collection'))}: {failure['error']}")
+        print(f"Index bootstrap finished: {len(report['created'])} created, {len(report['existing'])} up to date, "
+              f"{len(report['conflicts']) + len(report['unmanaged'])} drifted, {len(report['failed'])} failed")
+
+        in_place = set(report["created"]) | set(report["existing"])
+        self.unenforced_indexes = {
+            f"{collection_name}.{model.document['name']}"
+            for collection_name, models in registry.items()
+            for model in models
+        } - in_place
+        return report
+
+    def index_enforced(self, qualified_name):
+        """False if the last ensure_indexes run could not confirm this registry index is in place"""
+        return qualified_name not in self.unenforced_indexes
+
     def get_collection(self, collection_name):
-        """Get a collection object for direct MongoDB operations"""
-        return self.db[collection_name]
+        """Get a collection object for direct MongoDB operations (timed like the wrapper methods)"""
+        return InstrumentedCollection(self.db[collection_name], self.metrics)
         
     async def add(self, collection_name, data):
         collection = self.db[collection_name]
-        result = await collection.insert_one(data)
+        with self.metrics.track(collection_name, "insert_one") as op:
+            result = await self._write(collection_name, collection.insert_one(data))
+            op.documents = 1
+            op.bytes = document_size(data)
         
         if result.inserted_id:
             data["_id"] = str(result.inserted_id)
-            data = self.serializer(data)
             return {
                 "status": 200,
                 "data": data,
@@ -73,9 +425,16 @@ class Database:
                 "message": "Failed to add document"
             }
     
-    async def find_many(self, collection_name, query={}, projection=None, sort=None, limit=None):
-        """Find multiple documents matching query"""
-        collection = self.db[collection_name]
+    async def find_many(self, collection_name, query={}, projection=None, sort=None, limit=None, cache=True, read=None):
+        """Find multiple documents matching query; read selects the read profile (see read_profiles)"""
+        key = self._cache_key(f"find_many:{read or ''}", query, projection, sort, limit)
+        generation = self._cache_generations.get(collection_name)
+        if cache:
+            cached = self._cache_get(collection_name, key)
+            if cached is not _MISSING:
+                return cached
+
+        collection = self._reader(collection_name, read)
         cursor = collection.find(query, projection)
         
         if sort:
@@ -84,31 +443,107 @@ class Database:
             cursor = cursor.limit(limit)
             
         documents = []
-        async for doc in cursor:
-            doc["_id"] = str(doc["_id"])
-            doc = self.serializer(doc)
-            documents.append(doc)
+        with self.metrics.track(collection_name, "find", query) as op:
+            async for doc in cursor:
+                op.bytes += document_size(doc)
+                doc["_id"] = str(doc["_id"])
+                documents.append(doc)
+            op.documents = len(documents)
         
-        return {
+        result = {
             "status": 200,
             "data": documents,
             "message": "Documents retrieved successfully"
         }
+        if cache:
+            self._cache_set(collection_name, key, result, generation)
+        return result
     
-    async def find_one(self, collection_name, query):
+    async def iter_many(self, collection_name, query={}, projection=None, sort=None, limit=None, batch_size=100, read=None):
+        """
+        Async generator variant of find_many: yields serialized documents as the cursor
+        delivers them, so at most one batch is held in memory. Never cached.
+        """
+        collection = self._reader(collection_name, read)
+        cursor = collection.find(query, projection, batch_size=batch_size)
+
+        if sort:
+            cursor = cursor.sort(sort)
+        if limit:
+            cursor = cursor.limit(limit)
+
+        # Only time spent waiting on the cursor is recorded, not the consumer's
+        elapsed = 0.0
+        documents = 0
+        nbytes = 0
+        error = False
+        try:
+            while True:
+                started = time.perf_counter()
+                try:
+                    doc = await cursor.__anext__()
+                except StopAsyncIteration:
+                    break
+                finally:
+                    elapsed += time.perf_counter() - started
+                documents += 1
+                nbytes += document_size(doc)
+                doc["_id"] = str(doc["_id"])
+                yield doc
+        except Exception:
+            error = True
+            raise
+        finally:
+            self.metrics.record(collection_name, "find", elapsed * 1000, documents=documents, nbytes=nbytes, query=query, error=error)
+
+    async def find_one(self, collection_name, query, projection=None, hint=None, cache=True, read=None):
         """Find a single document (returns document directly or None)"""
-        collection = self.db[collection_name]
-        document = await collection.find_one(query)
+        key = self._cache_key(f"find_one:{read or ''}", query, projection, hint)
+        generation = self._cache_generations.get(collection_name)
+        if cache:
+            cached = self._cache_get(collection_name, key)
+            if cached is not _MISSING:
+                return cached
+
+        collection = self._reader(collection_name, read)
+        options = {"hint": hint} if hint else {}
+        with self.metrics.track(collection_name, "find_one", query) as op:
+            document = await collection.find_one(query, projection, **options)
+            if document:
+                op.documents = 1
+                op.bytes = document_size(document)
         
         if document:
             document["_id"] = str(document["_id"])
-            document = self.serializer(document)
-        
+
+        # Misses are not cached: a document created on another worker must show up at once
+        if cache and document is not None:
+            self._cache_set(collection_name, key, document, generation)
         return document
-            
+
+    async def exists(self, collection_name, query, hint=None, cache=True, read=None):
+        """Cheap existence check: counts at most one matching index entry, transfers no document"""
+        key = self._cache_key(f"exists:{read or ''}", query, None, hint)
+        generation = self._cache_generations.get(collection_name)
+        if cache:
+            cached = self._cache_get(collection_name, key)
+            if cached is not _MISSING:
+                return cached
+
+        collection = self._reader(collection_name, read)
+        options = {"hint": hint} if hint else {}
+        with self.metrics.track(collection_name, "exists", query):
+            found = await collection.count_documents(query, limit=1, **options) > 0
+
+        if cache and found:
+            self._cache_set(collection_name, key, found, generation)
+        return found
+
     async def update(self, collection_name, query, update_string):
         collection = self.db[collection_name]
-        result = await collection.update_one(query, update_string)
+        with self.metrics.track(collection_name, "update_one", query) as op:
+            result = await self._write(collection_name, collection.update_one(query, update_string))
+            op.documents = result.modified_count
         
         return {
             "status": 200 if result.modified_count > 0 else 404,
@@ -117,10 +552,31 @@ class Database:
             "message": "Document updated successfully" if result.modified_count > 0 else "Document not found or no changes made"
         }
     
+    async def find_one_and_update(self, collection_name, query, update_string, projection=None, return_updated=True):
+        """Atomically update a single document and return it (or None if nothing matched)"""
+        collection = self.db[collection_name]
+        with self.metrics.track(collection_name, "find_one_and_update", query) as op:
+            document = await self._write(collection_name, collection.find_one_and_update(
+                query,
+                update_string,
+                projection=projection,
+                return_document=ReturnDocument.AFTER if return_updated else ReturnDocument.BEFORE
+            ))
+            if document:
+                op.documents = 1
+                op.bytes = document_size(document)
+
+        if document:
+            document["_id"] = str(document["_id"])
+
+        return document
+
     async def update_many(self, collection_name, query, update_string):
         """Update multiple documents"""
         collection = self.db[collection_name]
-        result = await collection.update_many(query, update_string)
+        with self.metrics.track(collection_name, "update_many", query) as op:
+            result = await self._write(collection_name, collection.update_many(query, update_string))
+            op.documents = result.modified_count
         
         return {
             "status": 200,
@@ -129,9 +585,116 @@ class Database:
             "message": f"Updated {result.modified_count} documents"
         }
             
+    async def bulk_write(self, collection_name, operations, ordered=False):
+        """Execute a list of pymongo write operations in a single round trip"""
+        collection = self.db[collection_name]
+        with self.metrics.track(collection_name, "bulk_write") as op:
+            result = await self._write(collection_name, collection.bulk_write(operations, ordered=ordered))
+            op.documents = len(operations)
+
+        return {
+            "status": 200,
+            "inserted_count": result.inserted_count,
+            "matched_count": result.matched_count,
+            "modified_count": result.modified_count,
+            "deleted_count": result.deleted_count,
+            "upserted_count": result.upserted_count,
+            "message": f"Executed {len(operations)} operations"
+        }
+
+    async def _bulk_execute(self, collection_name, operations, chunk_size):
+        """
+        Run operations as unordered bulk_writes of at most chunk_size operations.
+        Returns one outcome per operation: {"ok": True, "upserted_id": ...} or {"ok": False, "error": ...}
+        """
+        collection = self.db[collection_name]
+        outcomes = []
+        for start in range(0, len(operations), chunk_size):
+            chunk = operations[start:start + chunk_size]
+            chunk_outcomes = [{"ok": True} for _ in chunk]
+            try:
+                with self.metrics.track(collection_name, "bulk_write") as op:
+                    op.documents = len(chunk)
+                    result = await self._write(collection_name, collection.bulk_write(chunk, ordered=False))
+                upserted = result.upserted_ids or {}
+            except BulkWriteError as e:
+                # Unordered: every operation without a write error was applied
+                for error in e.details.get("writeErrors", []):
+                    chunk_outcomes[error["index"]] = {"ok": False, "error": error.get("errmsg", "Write failed"), "code": error.get("code")}
+                upserted = {entry["index"]: entry["_id"] for entry in e.details.get("upserted", [])}
+
+            for index, upserted_id in upserted.items():
+                if chunk_outcomes[index]["ok"]:
+                    chunk_outcomes[index]["upserted_id"] = str(upserted_id)
+            outcomes.extend(chunk_outcomes)
+        return outcomes
+
+    @staticmethod
+    def _bulk_summary(results, message):
+        return {"status": 200, "counts": count_statuses(results), "results": results, "message": message}
+
+    async def bulk_add(self, collection_name, documents, chunk_size=BULK_CHUNK_SIZE):
+        """Insert many documents; reports inserted/failed per document"""
+        outcomes = await self._bulk_execute(collection_name, [InsertOne(document) for document in documents], chunk_size)
+
+        results = []
+        for index, (document, outcome) in enumerate(zip(documents, outcomes)):
+            if outcome["ok"]:
+                document["_id"] = str(document["_id"])
+                results.append({"index": index, "status": "inserted", "_id": document["_id"]})
+            else:
+                results.append({"index": index, "status": "failed", "error": outcome["error"]})
+        return self._bulk_summary(results, f"Processed {len(documents)} inserts")
+
+    async def bulk_upsert(self, collection_name, documents, key_fields, set_on_insert=None, chunk_size=BULK_CHUNK_SIZE):
+        """
+        Insert or update many documents matched on key_fields; set_on_insert(document) may
+        return extra fields written only when a document is created.
+        Reports inserted/updated/failed per document.
+        """
+        operations = []
+        for document in documents:
+            update = {"$set": {field: value for field, value in document.items() if field != "_id"}}
+            extra = set_on_insert(document) if set_on_insert else None
+            if extra:
+                update["$setOnInsert"] = extra
+            operations.append(UpdateOne({field: document[field] for field in key_fields}, update, upsert=True))
+
+        outcomes = await self._bulk_execute(collection_name, operations, chunk_size)
+
+        results = []
+        for index, outcome in enumerate(outcomes):
+            if not outcome["ok"]:
+                results.append({"index": index, "status": "failed", "error": outcome["error"]})
+            elif "upserted_id" in outcome:
+                results.append({"index": index, "status": "inserted", "_id": outcome["upserted_id"]})
+            else:
+                results.append({"index": index, "status": "updated"})
+        return self._bulk_summary(results, f"Processed {len(documents)} upserts")
+
+    async def bulk_update(self, collection_name, updates, upsert=False, chunk_size=BULK_CHUNK_SIZE):
+        """
+        Apply many (query, update_string) pairs. bulk_write only reports totals for
+        matches, so per update the result is applied/inserted (upserts) or failed.
+        """
+        operations = [UpdateOne(query, update_string, upsert=upsert) for query, update_string in updates]
+        outcomes = await self._bulk_execute(collection_name, operations, chunk_size)
+
+        results = []
+        for index, outcome in enumerate(outcomes):
+            if not outcome["ok"]:
+                results.append({"index": index, "status": "failed", "error": outcome["error"]})
+            elif "upserted_id" in outcome:
+                results.append({"index": index, "status": "inserted", "_id": outcome["upserted_id"]})
+            else:
+                results.append({"index": index, "status": "applied"})
+        return self._bulk_summary(results, f"Processed {len(updates)} updates")
+
     async def delete(self, collection_name, query):
         collection = self.db[collection_name]
-        result = await collection.delete_one(query)
+        with self.metrics.track(collection_name, "delete_one", query) as op:
+            result = await self._write(collection_name, collection.delete_one(query))
+            op.documents = result.deleted_count
         
         return {
             "status": 200 if result.deleted_count > 0 else 404,
@@ -0,0 +1,40 @@
+from fastapi import Request
+
+from config.config import EVENT_CACHE_TTL_SECONDS, EVENT_CACHE_MAX_ENTRIES
+from helpers.TTLCache import TTLCache
+
+
+def get_event_cache(request: Request):
+    """Dependency to get the event cache from app state"""
+    return request.app.state.event_cache
+
+
+class EventCache:
+    """
+    Read-through cache of event documents keyed by event_id.
+    Events only change through the admin EventRouter endpoints, which
+    invalidate entries explicitly; the TTL bounds staleness across workers.
+    Misses read through to the database uncached, so an event created on
+    another worker is found at once and an entry is never older than one TTL.
+    """
+    def __init__(self, ttl_seconds=EVENT_CACHE_TTL_SECONDS, max_entries=EVENT_CACHE_MAX_ENTRIES):
+        self._cache = TTLCache(max_entries=max_entries, ttl_seconds=ttl_seconds)
+
+    async def get(self, db, event_id):
+        """Return the event (a copy) or None; unknown events are not cached"""
+        event = self._cache.get(event_id)
+        if event is None:
+            event = await db.find_one("events", {"event_id": event_id}, cache=False)
+            if event is None:
+                return None
+            self._cache.set(event_id, event)
+        return dict(event)
+
+    def invalidate(self, event_id):
+        self._cache.invalidate(event_id)
+
+    def clear(self):
+        self._cache.clear()
+
+    def stats(self):
+        return self._cache.stats()
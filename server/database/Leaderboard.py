@@ -0,0 +1,231 @@
+import asyncio
+import base64
+import json
+import time
+from fastapi import Request
+from sortedcontainers import SortedList
+
+from config.config import LEADERBOARD_RESYNC_SECONDS
+
+
+def get_leaderboard(request: Request):
+    """Dependency to get the materialized leaderboard from app state"""
+    return request.app.state.leaderboard
+
+
+class Leaderboard:
+    """
+    Materialized leaderboard kept in memory, sorted by points descending.
+    Teams are loaded once from the database and then updated incrementally
+    by the scan endpoints in O(log n), so leaderboard reads never touch Mongo.
+    A periodic resync picks up writes made by other workers.
+    on_change(diff) is called whenever the visible ranking changes, with a
+    per-team diff for incremental updates or None when it was rebuilt.
+    """
+    def __init__(self, on_change=None):
+        self._entries = SortedList()  # (-points, team_id)
+        self._teams = {}  # team_id -> (points, team_name)
+        self._dirty = None
+        self._load_lock = asyncio.Lock()
+        self.loaded_at = None
+        self._on_change = on_change
+
+    @property
+    def loaded(self):
+        return self.loaded_at is not None
+
+    def __len__(self):
+        return len(self._teams)
+
+    async def load(self, db):
+        """(Re)build the leaderboard from the teams collection"""
+        async with self._load_lock:
+            # Updates applied while the snapshot is being read are replayed on top of it
+            self._dirty = {}
+            try:
+                # A lagging secondary is fine here: points only ever grow, so for teams
+                # already known the larger of the two values is kept
+                result = await db.find_many(
+                    "teams", {},
+                    projection={"_id": 1, "team_name": 1, "points": 1},
+                    sort=[("points", -1), ("_id", 1)],
+                    cache=False,
+                    read="secondary"
+                )
+                entries = SortedList()
+                teams = {}
+                for team in result["data"]:
+                    points = team.get("points", 0)
+                    known = self._teams.get(team["_id"])
+                    if known is not None and known[0] > points:
+                        points = known[0]
+                    teams[team["_id"]] = (points, team.get("team_name"))
+                    entries.add((-points, team["_id"]))
+
+                for team_id, (points, team_name) in self._dirty.items():
+                    if team_id in teams:
+                        # Points only ever grow, so the larger value is the newer one
+                        entries.remove((-teams[team_id][0], team_id))
+                        points = max(points, teams[team_id][0])
+                    teams[team_id] = (points, team_name)
+                    entries.add((-points, team_id))
+
+                changed = teams != self._teams
+                self._entries = entries
+                self._teams = teams
+                self.loaded_at = time.time()
+                if changed:
+                    self._changed(None)
+            finally:
+                self._dirty = None
+
+    def _changed(self, diff):
+        if self._on_change is not None:
+            self._on_change(diff)
+
+    async def ensure_loaded(self, db):
+        if not self.loaded:
+            await self.load(db)
+
+    async def resync_forever(self, db, interval=LEADERBOARD_RESYNC_SECONDS):
+        """Background task reloading the leaderboard every interval seconds"""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.load(db)
+            except Exception as e:
+                print(f"Leaderboard resync failed: {e}")
+
+    def upsert(self, team_id, team_name, points):
+        """Set a team's points; returns (previous_points, points)"""
+        previous = self._teams.get(team_id)
+        previous_rank = None
+        if previous is not None:
+            if previous[0] > 0:
+                previous_rank = self._entries.bisect_left((-previous[0],)) + 1
+            self._entries.remove((-previous[0], team_id))
+        self._teams[team_id] = (points, team_name)
+        self._entries.add((-points, team_id))
+
+        if self._dirty is not None:
+            self._dirty[team_id] = (points, team_name)
+
+        # Teams without points are not shown, so their changes are invisible
+        if previous != (points, team_name) and (points > 0 or previous_rank is not None):
+            previous_points = previous[0] if previous else 0
+            self._changed({
+                "_id": team_id,
+                "name": team_name,
+                "points": points,
+                "delta": points - previous_points,
+                "rank": self._entries.bisect_left((-points,)) + 1 if points > 0 else None,
+                "previous_rank": previous_rank
+            })
+
+        return (previous[0] if previous else None), points
+
+    def add_points(self, team_id, team_name, delta):
+        """Increment a team's points by delta"""
+        previous = self._teams.get(team_id)
+        return self.upsert(team_id, team_name, (previous[0] if previous else 0) + delta)
+
+    def remove(self, team_id):
+        previous = self._teams.pop(team_id, None)
+        if previous is not None:
+            self._entries.remove((-previous[0], team_id))
+            if previous[0] > 0:
+                self._changed(None)
+
+    def _view(self, entry):
+        team_id = entry[1]
+        points, team_name = self._teams[team_id]
+        return {"_id": team_id, "name": team_name, "points": points}
+
+    def _ranked_count(self):
+        """Number of teams with points > 0; they form a prefix of the sorted entries"""
+        return self._entries.bisect_left((0,))
+
+    def rank(self, team_id):
+        """
+        Rank of a team (1 + number of teams with strictly more points) together
+        with its neighbours in the sorted order, or None for unknown teams.
+        """
+        team = self._teams.get(team_id)
+        if team is None:
+            return None
+
+        points = team[0]
+        index = self._entries.index((-points, team_id))
+        neighbours = {}
+        for label, position in (("above", index - 1), ("below", index + 1)):
+            if 0 <= position < len(self._entries):
+                neighbour = self._view(self._entries[position])
+                neighbour["gap"] = abs(neighbour["points"] - points)
+                neighbours[label] = neighbour
+            else:
+                neighbours[label] = None
+
+        return {
+            "rank": self._entries.bisect_left((-points,)) + 1,
+            "points": points,
+            "total_teams": len(self._entries),
+            "above": neighbours["above"],
+            "below": neighbours["below"]
+        }
+
+    def top(self, n=10):
+        """Top n teams with points > 0"""
+        stop = min(n, self._ranked_count())
+        return [self._view(entry) for entry in self._entries.islice(0, stop)]
+
+    def page(self, limit, after=None):
+        """
+        Keyset page of teams with points > 0 following the (points, _id) cursor.
+        Returns the teams and the cursor for the next page (None on the last page).
+        """
+        ranked = self._ranked_count()
+        start = 0
+        if after is not None:
+            points, team_id = after
+            start = self._entries.bisect_right((-points, team_id))
+        stop = min(start + limit, ranked)
+
+        teams = [self._view(entry) for entry in self._entries.islice(start, stop)]
+        next_cursor = None
+        if stop < ranked and teams:
+            next_cursor = self.encode_cursor(teams[-1]["points"], teams[-1]["_id"])
+        return teams, next_cursor
+
+    @staticmethod
+    def encode_cursor(points, team_id):
+        raw = json.dumps([points, team_id], separators=(",", ":")).encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+    @staticmethod
+    def decode_cursor(cursor):
+        """Decode an opaque cursor into (points, _id); raises ValueError if malformed"""
+        try:
+            raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+            points, team_id = json.loads(raw)
+        except Exception:
+            raise ValueError("Invalid cursor")
+        if not isinstance(points, (int, float)) or not isinstance(team_id, str):
+            raise ValueError("Invalid cursor")
+        return points, team_id
+
+    def all(self):
+        """All teams with points > 0"""
+        return [self._view(entry) for entry in self._entries.islice(0, self._ranked_count())]
+
+    def iter_all(self, chunk_size=500):
+        """
+        Lazily yield all teams with points > 0, one keyset page at a time so
+        that concurrent updates between pages cannot break the iteration.
+        """
+        cursor = None
+        while True:
+            teams, next_cursor = self.page(chunk_size, cursor)
+            yield from teams
+            if next_cursor is None:
+                return
+            cursor = (teams[-1]["points"], teams[-1]["_id"])
@@ -0,0 +1,791 @@
+"""
+In-memory stand-in for the Motor client, used by the memory:// storage backend
+for tests, local development and offline benchmarks.
+
+It implements the subset of MongoDB the Database wrapper and the routers rely on:
+query operators ($eq, $ne, $gt, $gte, $lt, $lte, $in, $nin, $exists, $elemMatch,
+$size, $not, $and, $or, $nor) with dotted paths into arrays, update operators
+($set, $unset, $inc, $push, $addToSet, $pull, $setOnInsert, with $each),
+upserts, inclusion/exclusion projections including $elemMatch, sort/skip/limit,
+bulk_write, and unique (partial) indexes that raise DuplicateKeyError.
+Every operation runs synchronously inside its coroutine, so each one is atomic
+with respect to the event loop just like a single-document write in MongoDB.
+"""
+import copy
+import itertools
+import time
+from datetime import datetime, timedelta, timezone
+from bson import ObjectId
+from pymongo import InsertOne, UpdateOne, UpdateMany, ReplaceOne, DeleteOne, DeleteMany
+from pymongo.errors import DuplicateKeyError, BulkWriteError, OperationFailure, WriteError
+from pymongo.results import InsertOneResult, InsertManyResult, UpdateResult, DeleteResult, BulkWriteResult
+
+DUPLICATE_KEY = 11000
+
+# BSON comparison order between types, used for sorting and range operators
+_TYPE_ORDER = ((type(None), 0), (bool, 8), ((int, float), 1), (str, 2), (dict, 3), (list, 4), (ObjectId, 7), (datetime, 9))
+
+
+def _type_rank(value):
+    for types, rank in _TYPE_ORDER:
+        if isinstance(value, types):
+            return rank
+    return 10
+
+
+def _comparable(value):
+    if isinstance(value, datetime) and value.tzinfo is not None:
+        # Naive datetimes are UTC in this code base
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def _sort_key(value):
+    rank = _type_rank(value)
+    if rank in (3, 4, 10):
+        return (rank, repr(value))
+    return (rank, _comparable(value))
+
+
+def _equal(a, b):
+    return _type_rank(a) == _type_rank(b) and _comparable(a) == _comparable(b)
+
+
+def _freeze(value):
+    """Hashable version of a value, for unique index keys"""
+    if isinstance(value, dict):
+        return ("dict", tuple((key, _freeze(item)) for key, item in value.items()))
+    if isinstance(value, list):
+        return ("list", tuple(_freeze(item) for item in value))
+    return (_type_rank(value), _comparable(value))
+
+
+def _values(document, parts):
+    """All values at a dotted path, descending into arrays the way MongoDB does"""
+    if not parts:
+        return [document]
+    head, rest = parts[0], parts[1:]
+    if isinstance(document, dict):
+        return _values(document[head], rest) if head in document else []
+    if isinstance(document, list):
+        if head.isdigit():
+            index = int(head)
+            return _values(document[index], rest) if index < len(document) else []
+        found = []
+        for item in document:
+            if isinstance(item, (dict, list)):
+                found.extend(_values(item, parts))
+        return found
+    return []
+
+
+def _expanded(values):
+    """Values plus the elements of array values, as used by equality and range matches"""
+    result = []
+    for value in values:
+        result.append(value)
+        if isinstance(value, list):
+            result.extend(value)
+    return result
+
+
+def _is_operator_dict(value):
+    return isinstance(value, dict) and value and all(key.startswith("$") for key in value)
+
+
+def _compare(values, operand, predicate):
+    for value in _expanded(values):
+        if _type_rank(value) == _type_rank(operand) and _type_rank(value) not in (3, 4, 10):
+            if predicate(_comparable(value), _comparable(operand)):
+                return True
+    return False
+
+
+def _equals_any(values, operand):
+    if operand is None and not values:
+        return True
+    return any(_equal(value, operand) for value in _expanded(values))
+
+
+def _element_matches(element, condition):
+    if _is_operator_dict(condition):
+        return _match_condition([element], condition, wrap=False)
+    return isinstance(element, dict) and matches(element, condition)
+
+
+def _match_operator(values, operator, operand):
+    if operator == "$eq":
+        return _equals_any(values, operand)
+    if operator == "$ne":
+        return not _equals_any(values, operand)
+    if operator == "$in":
+        return any(_equals_any(values, item) for item in operand)
+    if operator == "$nin":
+        return not any(_equals_any(values, item) for item in operand)
+    if operator == "$gt":
+        return _compare(values, operand, lambda a, b: a > b)
+    if operator == "$gte":
+        return _compare(values, operand, lambda a, b: a >= b)
+    if operator == "$lt":
+        return _compare(values, operand, lambda a, b: a < b)
+    if operator == "$lte":
+        return _compare(values, operand, lambda a, b: a <= b)
+    if operator == "$exists":
+        return bool(values) == bool(operand)
+    if operator == "$size":
+        return any(isinstance(value, list) and len(value) == operand for value in values)
+    if operator == "$elemMatch":
+        return any(
+            isinstance(value, list) and any(_element_matches(element, operand) for element in value)
+            for value in values
+        )
+    if operator == "$not":
+        return not _match_condition(values, operand)
+    raise OperationFailure(f"unknown operator: {operator}", code=2)
+
+
+def _match_condition(values, condition, wrap=True):
+    if _is_operator_dict(condition):
+        return all(_match_operator(values, operator, operand) for operator, operand in condition.items())
+    if wrap:
+        return _equals_any(values, condition)
+    return any(_equal(value, condition) for value in values)
+
+
+def matches(document, query):
+    """True if the document satisfies the MongoDB query"""
+    for key, condition in (query or {}).items():
+        if key == "$and":
+            if not all(matches(document, part) for part in condition):
+                return False
+        elif key == "$or":
+            if not any(matches(document, part) for part in condition):
+                return False
+        elif key == "$nor":
+            if any(matches(document, part) for part in condition):
+                return False
+        elif key.startswith("$"):
+            raise OperationFailure(f"unknown top level operator: {key}", code=2)
+        elif not _match_condition(_values(document, key.split(".")), condition):
+            return False
+    return True
+
+
+def _parent(document, path, create=True):
+    """(container, last key) for a dotted path, creating intermediate documents"""
+    parts = path.split(".")
+    current = document
+    for part in parts[:-1]:
+        if isinstance(current, list) and part.isdigit():
+            index = int(part)
+            while create and len(current) <= index:
+                current.append(None)
+            if index >= len(current):
+                return None, None
+            if current[index] is None and create:
+                current[index] = {}
+            current = current[index]
+        elif isinstance(current, dict):
+            if part not in current:
+                if not create:
+                    return None, None
+                current[part] = {}
+            current = current[part]
+        else:
+            if not create:
+                return None, None
+            raise WriteError(f"Cannot create field '{part}' in element of type {type(current).__name__}", code=28)
+    last = parts[-1]
+    if isinstance(current, list):
+        if not last.isdigit():
+            raise WriteError(f"Cannot create field '{last}' in an array", code=28)
+        last = int(last)
+        while create and len(current) <= last:
+            current.append(None)
+    return current, last
+
+
+def _get(document, path):
+    container, key = _parent(document, path, create=False)
+    if not isinstance(container, (dict, list)):
+        return None, False
+    if isinstance(container, list):
+        return (container[key], True) if key < len(container) else (None, False)
+    return (container[key], True) if key in container else (None, False)
+
+
+def _each(operand):
+    if isinstance(operand, dict) and "$each" in operand:
+        return list(operand["$each"])
+    return [operand]
+
+
+def _array_at(document, path, operator):
+    value, found = _get(document, path)
+    if not found or value is None:
+        container, key = _parent(document, path)
+        container[key] = []
+        return container[key]
+    if not isinstance(value, list):
+        raise WriteError(f"The field '{path}' must be an array for {operator}", code=2)
+    return value
+
+
+def apply_update(document, update, inserting=False):
+    """Apply MongoDB update operators to the document in place"""
+    if not update or not all(key.startswith("$") for key in update):
+        raise WriteError("update document requires atomic operators", code=9)
+
+    for operator, fields in update.items():
+        for path, operand in fields.items():
+            if operator == "$set":
+                container, key = _parent(document, path)
+                container[key] = copy.deepcopy(operand)
+            elif operator == "$setOnInsert":
+                if inserting:
+                    container, key = _parent(document, path)
+                    container[key] = copy.deepcopy(operand)
+            elif operator == "$unset":
+                container, key = _parent(document, path, create=False)
+                if isinstance(container, dict):
+                    container.pop(key, None)
+                elif isinstance(container, list) and key < len(container):
+                    container[key] = None
+            elif operator == "$inc":
+                current, found = _get(document, path)
+                if found and current is not None and not isinstance(current, (int, float)):
+                    raise WriteError(f"Cannot apply $inc to a value of non-numeric type for '{path}'", code=14)
+                container, key = _parent(document, path)
+                container[key] = (current or 0) + operand
+            elif operator == "$push":
+                _array_at(document, path, operator).extend(copy.deepcopy(_each(operand)))
+            elif operator == "$addToSet":
+                array = _array_at(document, path, operator)
+                for item in _each(operand):
+                    if not any(_equal(existing, item) for existing in array):
+                        array.append(copy.deepcopy(item))
+            elif operator == "$pull":
+                value, found = _get(document, path)
+                if found and isinstance(value, list):
+                    value[:] = [element for element in value if not _pull_matches(element, operand)]
+            else:
+                raise WriteError(f"Unknown modifier: {operator}", code=9)
+
+
+def _pull_matches(element, condition):
+    if isinstance(condition, dict) and condition and not _is_operator_dict(condition):
+        return isinstance(element, dict) and matches(element, condition)
+    return _match_condition([element], condition, wrap=False)
+
+
+def _upsert_seed(query):
+    """Fields copied from equality conditions of the filter into an upserted document"""
+    document = {}
+    for key, condition in (query or {}).items():
+        if key.startswith("$"):
+            continue
+        if _is_operator_dict(condition):
+            if "$eq" not in condition:
+                continue
+            condition = condition["$eq"]
+        container, last = _parent(document, key)
+        container[last] = copy.deepcopy(condition)
+    return document
+
+
+def project(document, projection):
+    """Apply a find() projection to a document copy"""
+    if not projection:
+        return copy.deepcopy(document)
+    if isinstance(projection, (list, tuple)):
+        projection = {field: 1 for field in projection}
+
+    include_id = bool(projection.get("_id", 1))
+    fields = {key: value for key, value in projection.items() if key != "_id"}
+    element_matches = {key: value["$elemMatch"] for key, value in fields.items()
+                       if isinstance(value, dict) and "$elemMatch" in value}
+    plain = {key: value for key, value in fields.items() if key not in element_matches}
+    if plain:
+        inclusive = any(bool(value) for value in plain.values())
+    else:
+        inclusive = bool(element_matches) or (include_id and "_id" in projection)
+
+    if inclusive:
+        result = {}
+        for path in plain:
+            _copy_path(document, result, path.split("."))
+    else:
+        result = copy.deepcopy(document)
+        for path in plain:
+            _remove_path(result, path.split("."))
+
+    for field, condition in element_matches.items():
+        value = document.get(field)
+        result.pop(field, None)
+        if isinstance(value, list):
+            for element in value:
+                if _element_matches(element, condition):
+                    result[field] = [copy.deepcopy(element)]
+                    break
+
+    if include_id and "_id" in document:
+        result = {"_id": document["_id"], **{key: value for key, value in result.items() if key != "_id"}}
+    else:
+        result.pop("_id", None)
+    return result
+
+
+def _copy_path(source, target, parts):
+    head, rest = parts[0], parts[1:]
+    if head not in source:
+        return
+    value = source[head]
+    if not rest:
+        target[head] = copy.deepcopy(value)
+    elif isinstance(value, dict):
+        _copy_path(value, target.setdefault(head, {}), rest)
+    elif isinstance(value, list):
+        documents = [item for item in value if isinstance(item, dict)]
+        projected = target.setdefault(head, [{} for _ in documents])
+        for item, projected_item in zip(documents, projected):
+            _copy_path(item, projected_item, rest)
+
+
+def _remove_path(document, parts):
+    head, rest = parts[0], parts[1:]
+    if not isinstance(document, dict) or head not in document:
+        return
+    if not rest:
+        del document[head]
+    elif isinstance(document[head], list):
+        for item in document[head]:
+            _remove_path(item, rest)
+    else:
+        _remove_path(document[head], rest)
+
+
+def _normalize_sort(sort, direction=None):
+    if sort is None:
+        return []
+    if isinstance(sort, str):
+        return [(sort, direction or 1)]
+    if isinstance(sort, dict):
+        return list(sort.items())
+    return [(field, order) for field, order in sort]
+
+
+def sort_documents(documents, sort):
+    for field, direction in reversed(sort):
+        parts = field.split(".")
+
+        def key(document, parts=parts, direction=direction):
+            values = _expanded(_values(document, parts))
+            if not values:
+                return _sort_key(None)
+            # Arrays sort by their smallest element ascending, largest descending
+            keys = [_sort_key(value) for value in values if not isinstance(value, list)] or [_sort_key(values[0])]
+            return min(keys) if direction == 1 else max(keys)
+
+        documents.sort(key=key, reverse=direction == -1)
+    return documents
+
+
+class MemoryIndex:
+    def __init__(self, spec):
+        self.spec = spec
+        self.name = spec["name"]
+        self.fields = [field for field, _ in spec["key"]]
+        self.unique = bool(spec.get("unique"))
+        self.partial = spec.get("partialFilterExpression")
+        self.entries = {}  # frozen key -> _id, unique indexes only
+
+    def keys(self, document):
+        if self.partial is not None and not matches(document, self.partial):
+            return set()
+        per_field = []
+        for field in self.fields:
+            values = _expanded(_values(document, field.split(".")))
+            values = [value for value in values if not isinstance(value, list)] or [None]
+            per_field.append(values)
+        return {tuple(_freeze(value) for value in combination) for combination in itertools.product(*per_field)}
+
+    def info(self):
+        info = {"key": list(self.spec["key"]), "v": 2}
+        for option in ("unique", "sparse", "partialFilterExpression", "expireAfterSeconds"):
+            if option in self.spec:
+                info[option] = self.spec[option]
+        return info
+
+
+class MemoryCursor:
+    """Lazy cursor over a MemoryCollection supporting sort/skip/limit chaining"""
+    def __init__(self, collection, query, projection, sort=None, limit=0, skip=0):
+        self._collection = collection
+        self._query = query
+        self._projection = projection
+        self._sort = _normalize_sort(sort)
+        self._limit = limit or 0
+        self._skip = skip or 0
+        self._results = None
+
+    def sort(self, key_or_list, direction=None):
+        self._sort = _normalize_sort(key_or_list, direction)
+        return self
+
+    def limit(self, limit):
+        self._limit = limit
+        return self
+
+    def skip(self, skip):
+        self._skip = skip
+        return self
+
+    def batch_size(self, batch_size):
+        return self
+
+    def hint(self, index):
+        return self
+
+    def _evaluate(self):
+        if self._results is None:
+            if self._sort:
+                documents = sort_documents(self._collection._select(self._query), self._sort)
+            else:
+                documents = self._collection._select(self._query, limit=self._skip + self._limit if self._limit else 0)
+            documents = documents[self._skip:]
+            if self._limit:
+                documents = documents[:self._limit]
+            self._results = iter([project(document, self._projection) for document in documents])
+        return self._results
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self._evaluate())
+        except StopIteration:
+            raise StopAsyncIteration
+
+    async def to_list(self, length=None):
+        results = self._evaluate()
+        if length:
+            return list(itertools.islice(results, length))
+        return list(results)
+
+
+class MemoryCollection:
+    def __init__(self, name):
+        self.name = name
+        self._documents = {}  # frozen _id -> document, in insertion order
+        self._indexes = {"_id_": MemoryIndex({"name": "_id_", "key": [("_id", 1)]})}
+        self._next_purge = 0.0
+
+    def with_options(self, **options):
+        # Read preferences and concerns are meaningless for a single in-process copy
+        return self
+
+    # Internal helpers
+
+    def _purge_expired(self):
+        """Drop documents past a TTL index expiry, at most once per second like the TTL monitor"""
+        now = time.monotonic()
+        if now < self._next_purge:
+            return
+        self._next_purge = now + 1
+        for index in self._indexes.values():
+            ttl = index.spec.get("expireAfterSeconds")
+            if ttl is None:
+                continue
+            cutoff = datetime.utcnow() - timedelta(seconds=ttl)
+            field = index.fields[0]
+            expired = [
+                key for key, document in self._documents.items()
+                if any(isinstance(value, datetime) and _comparable(value) <= cutoff
+                       for value in _expanded(_values(document, field.split("."))))
+            ]
+            for key in expired:
+                self._unindex(self._documents.pop(key))
+
+    def _candidates(self, query):
+        """Documents that may match: a unique index lookup for equality on an indexed field, else all"""
+        if not query:
+            return self._documents.values()
+        if "_id" in query and not isinstance(query["_id"], (dict, list)):
+            document = self._documents.get(_freeze(query["_id"]))
+            return [document] if document is not None else []
+        for index in self._indexes.values():
+            if not index.unique or len(index.fields) != 1:
+                continue
+            field = index.fields[0]
+            value = query.get(field)
+            if value is None or isinstance(value, (dict, list)):
+                continue
+            if index.partial is not None and index.partial != {field: {"$exists": True}}:
+                continue
+            owner = index.entries.get((_freeze(value),))
+            document = self._documents.get(_freeze(owner)) if owner is not None else None
+            return [document] if document is not None else []
+        return self._documents.values()
+
+    def _select(self, query, limit=0):
+        self._purge_expired()
+        selected = []
+        for document in self._candidates(query):
+            if matches(document, query):
+                selected.append(document)
+                if limit and len(selected) >= limit:
+                    break
+        return selected
+
+    def _check_unique(self, document, previous=None):
+        for index in self._indexes.values():
+            if not index.unique:
+                continue
+            for key in index.keys(document):
+                owner = index.entries.get(key)
+                if owner is not None and (previous is None or _freeze(owner) != _freeze(previous["_id"])):
+                    values = dict(zip(index.fields, (_values(document, field.split(".")) for field in index.fields)))
+                    raise self._duplicate_key(index, f"dup key: {values}")
+
+    def _duplicate_key(self, index, detail=""):
+        message = f"E11000 duplicate key error collection: {self.name} index: {index.name} {detail}".rstrip()
+        return DuplicateKeyError(message, code=DUPLICATE_KEY, details={
+            "index": index.name, "keyPattern": dict(index.spec["key"]), "code": DUPLICATE_KEY, "errmsg": message
+        })
+
+    def _index(self, document):
+        for index in self._indexes.values():
+            if index.unique:
+                for key in index.keys(document):
+                    index.entries[key] = document["_id"]
+
+    def _unindex(self, document):
+        for index in self._indexes.values():
+            if index.unique:
+                for key in index.keys(document):
+                    index.entries.pop(key, None)
+
+    def _insert(self, document):
+        document = copy.deepcopy(document)
+        if "_id" not in document:
+            document["_id"] = ObjectId()
+        if _freeze(document["_id"]) in self._documents:
+            raise self._duplicate_key(self._indexes["_id_"], f"dup key: {{ _id: {document['_id']!r} }}")
+        self._check_unique(document)
+        self._documents[_freeze(document["_id"])] = document
+        self._index(document)
+        return document
+
+    def _replace(self, previous, updated):
+        if _freeze(updated.get("_id")) != _freeze(previous["_id"]):
+            raise WriteError("Performing an update on the path '_id' would modify the immutable field '_id'", code=66)
+        self._check_unique(updated, previous)
+        self._unindex(previous)
+        self._documents[_freeze(previous["_id"])] = updated
+        self._index(updated)
+
+    def _update(self, query, update, upsert=False, multi=False, sort=None, replacement=False):
+        """Returns (matched, modified, upserted_id, before, after) for the last document touched"""
+        if sort:
+            documents = sort_documents(self._select(query), _normalize_sort(sort))
+        else:
+            documents = self._select(query, limit=0 if multi else 1)
+        if not multi:
+            documents = documents[:1]
+
+        if not documents:
+            if not upsert:
+                return 0, 0, None, None, None
+            seed = _upsert_seed(query)
+            if replacement:
+                document = {**({"_id": seed["_id"]} if "_id" in seed else {}), **copy.deepcopy(update)}
+            else:
+                document = seed
+                apply_update(document, update, inserting=True)
+            document = self._insert(document)
+            return 0, 0, document["_id"], None, document
+
+        modified = 0
+        before = after = None
+        for document in documents:
+            updated = copy.deepcopy(document)
+            if replacement:
+                updated = {"_id": document["_id"], **copy.deepcopy(update)}
+            else:
+                apply_update(updated, update)
+            if updated != document:
+                self._replace(document, updated)
+                modified += 1
+            before, after = document, updated
+        return len(documents), modified, None, before, after
+
+    # Motor collection API
+
+    def find(self, filter=None, projection=None, sort=None, limit=0, skip=0, batch_size=None, **kwargs):
+        return MemoryCursor(self, filter or {}, projection, sort=sort, limit=limit, skip=skip)
+
+    async def find_one(self, filter=None, projection=None, sort=None, **kwargs):
+        if filter is not None and not isinstance(filter, dict):
+            filter = {"_id": filter}
+        documents = await MemoryCursor(self, filter or {}, projection, sort=sort, limit=1).to_list(1)
+        return documents[0] if documents else None
+
+    async def count_documents(self, filter, limit=None, skip=0, **kwargs):
+        count = max(len(self._select(filter)) - (skip or 0), 0)
+        return min(count, limit) if limit else count
+
+    async def insert_one(self, document):
+        inserted = self._insert(document)
+        document.setdefault("_id", inserted["_id"])
+        return InsertOneResult(inserted["_id"], True)
+
+    async def insert_many(self, documents, ordered=True):
+        await self.bulk_write([InsertOne(document) for document in documents], ordered=ordered)
+        return InsertManyResult([document["_id"] for document in documents], True)
+
+    async def update_one(self, filter, update, upsert=False, **kwargs):
+        matched, modified, upserted_id, _, _ = self._update(filter, update, upsert=upsert, sort=kwargs.get("sort"))
+        raw = {"n": matched or (1 if upserted_id is not None else 0), "nModified": modified}
+        if upserted_id is not None:
+            raw["upserted"] = upserted_id
+        return UpdateResult(raw, True)
+
+    async def update_many(self, filter, update, upsert=False, **kwargs):
+        matched, modified, upserted_id, _, _ = self._update(filter, update, upsert=upsert, multi=True)
+        raw = {"n": matched or (1 if upserted_id is not None else 0), "nModified": modified}
+        if upserted_id is not None:
+            raw["upserted"] = upserted_id
+        return UpdateResult(raw, True)
+
+    async def replace_one(self, filter, replacement, upsert=False, **kwargs):
+        matched, modified, upserted_id, _, _ = self._update(filter, replacement, upsert=upsert, replacement=True)
+        raw = {"n": matched or (1 if upserted_id is not None else 0), "nModified": modified}
+        if upserted_id is not None:
+            raw["upserted"] = upserted_id
+        return UpdateResult(raw, True)
+
+    async def find_one_and_update(self, filter, update, projection=None, sort=None, upsert=False, return_document=False, **kwargs):
+        matched, _, upserted_id, before, after = self._update(filter, update, upsert=upsert, sort=sort)
+        document = after if return_document else before
+        return project(document, projection) if document is not None else None
+
+    async def _delete(self, filter, multi):
+        documents = self._select(filter, limit=0 if multi else 1)
+        for document in documents:
+            self._unindex(self._documents.pop(_freeze(document["_id"])))
+        return DeleteResult({"n": len(documents)}, True)
+
+    async def delete_one(self, filter, **kwargs):
+        return await self._delete(filter, multi=False)
+
+    async def delete_many(self, filter, **kwargs):
+        return await self._delete(filter, multi=True)
+
+    async def bulk_write(self, requests, ordered=True, **kwargs):
+        result = {
+            "writeErrors": [], "writeConcernErrors": [], "nInserted": 0, "nUpserted": 0,
+            "nMatched": 0, "nModified": 0, "nRemoved": 0, "upserted": []
+        }
+        for index, request in enumerate(requests):
+            try:
+                if isinstance(request, InsertOne):
+                    inserted = self._insert(request._doc)
+                    request._doc.setdefault("_id", inserted["_id"])
+                    result["nInserted"] += 1
+                elif isinstance(request, (UpdateOne, UpdateMany, ReplaceOne)):
+                    matched, modified, upserted_id, _, _ = self._update(
+                        request._filter, request._doc, upsert=bool(request._upsert),
+                        multi=isinstance(request, UpdateMany), replacement=isinstance(request, ReplaceOne)
+                    )
+                    result["nMatched"] += matched
+                    result["nModified"] += modified
+                    if upserted_id is not None:
+                        result["nUpserted"] += 1
+                        result["upserted"].append({"index": index, "_id": upserted_id})
+                elif isinstance(request, (DeleteOne, DeleteMany)):
+                    deleted = await self._delete(request._filter, multi=isinstance(request, DeleteMany))
+                    result["nRemoved"] += deleted.deleted_count
+                else:
+                    raise TypeError(f"{request!r} is not a valid request")
+            except (OperationFailure, WriteError) as e:
+                errmsg = (e.details or {}).get("errmsg", str(e))
+                result["writeErrors"].append({"index": index, "code": e.code, "errmsg": errmsg, "op": request})
+                if ordered:
+                    break
+
+        if result["writeErrors"]:
+            raise BulkWriteError(result)
+        return BulkWriteResult(result, True)
+
+    async def index_information(self):
+        return {name: index.info() for name, index in self._indexes.items()}
+
+    async def create_indexes(self, indexes, **kwargs):
+        names = []
+        for model in indexes:
+            spec = dict(model.document)
+            spec["key"] = list(spec["key"].items())
+            name = spec["name"]
+            existing = self._indexes.get(name)
+            if existing is not None:
+                if existing.spec != spec:
+                    raise OperationFailure(f"An existing index has the same name as the requested index: {name}", code=86)
+                names.append(name)
+                continue
+
+            index = MemoryIndex(spec)
+            if index.unique:
+                for document in self._documents.values():
+                    for key in index.keys(document):
+                        if key in index.entries:
+                            raise self._duplicate_key(index)
+                        index.entries[key] = document["_id"]
+            self._indexes[name] = index
+            names.append(name)
+        return names
+
+    async def drop_index(self, name):
+        if name not in self._indexes or name == "_id_":
+            raise OperationFailure(f"index not found with name [{name}]", code=27)
+        del self._indexes[name]
+
+    async def drop(self):
+        self._documents.clear()
+        self._indexes = {"_id_": self._indexes["_id_"]}
+        self._indexes["_id_"].entries.clear()
+
+
+class MemoryDatabase:
+    def __init__(self, name):
+        self.name = name
+        self._collections = {}
+
+    def __getitem__(self, name):
+        collection = self._collections.get(name)
+        if collection is None:
+            collection = self._collections[name] = MemoryCollection(name)
+        return collection
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return self[name]
+
+    async def list_collection_names(self):
+        return list(self._collections)
+
+
+class MemoryClient:
+    """Drop-in for AsyncIOMotorClient holding every database in process memory"""
+    def __init__(self):
+        self._databases = {}
+
+    def __getitem__(self, name):
+        database = self._databases.get(name)
+        if database is None:
+            database = self._databases[name] = MemoryDatabase(name)
+        return database
+
+    def close(self):
+        self._databases.clear()
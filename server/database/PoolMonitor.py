@@ -0,0 +1,102 @@
+import threading
+import time
+from pymongo.monitoring import ConnectionPoolListener, ConnectionCheckOutFailedReason
+
+from helpers.LatencyHistogram import LatencyHistogram
+
+# Minimum seconds between two "pool exhausted" log lines
+EXHAUSTION_LOG_INTERVAL = 10
+
+
+class PoolMonitor(ConnectionPoolListener):
+    """
+    Connection pool listener registered on the Motor client. It records how long
+    operations wait to check out a connection and counts checkout failures, in
+    particular wait-queue timeouts, which mean the pool was exhausted.
+    PyMongo calls listeners from its own threads, so all state is guarded by a lock.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._checkout_wait = LatencyHistogram()
+        self.checkouts = 0
+        self.checkout_failures = {}
+        self.exhausted = 0
+        self.connections_open = 0
+        self.connections_in_use = 0
+        self.connections_created = 0
+        self.pool_clears = 0
+        self._last_exhaustion_log = 0.0
+
+    def connection_created(self, event):
+        with self._lock:
+            self.connections_open += 1
+            self.connections_created += 1
+
+    def connection_closed(self, event):
+        with self._lock:
+            self.connections_open -= 1
+
+    def connection_checked_out(self, event):
+        with self._lock:
+            self.checkouts += 1
+            self.connections_in_use += 1
+            if event.duration is not None:
+                self._checkout_wait.observe(event.duration * 1000)
+
+    def connection_checked_in(self, event):
+        with self._lock:
+            self.connections_in_use -= 1
+
+    def connection_check_out_failed(self, event):
+        log = False
+        with self._lock:
+            self.checkout_failures[event.reason] = self.checkout_failures.get(event.reason, 0) + 1
+            if event.reason == ConnectionCheckOutFailedReason.TIMEOUT:
+                self.exhausted += 1
+                now = time.monotonic()
+                if now - self._last_exhaustion_log >= EXHAUSTION_LOG_INTERVAL:
+                    self._last_exhaustion_log = now
+                    log = True
+            if event.duration is not None:
+                self._checkout_wait.observe(event.duration * 1000)
+            exhausted = self.exhausted
+        if log:
+            print(f"MongoDB connection pool exhausted for {event.address[0]}:{event.address[1]} "
+                  f"({exhausted} wait-queue timeouts so far); consider raising MONGO_MAX_POOL_SIZE")
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        with self._lock:
+            self.pool_clears += 1
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_check_out_started(self, event):
+        pass
+
+    def checkout_wait(self):
+        """Snapshot of the checkout wait histogram (milliseconds)"""
+        with self._lock:
+            return self._checkout_wait.copy()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "connections_open": self.connections_open,
+                "connections_in_use": self.connections_in_use,
+                "connections_created": self.connections_created,
+                "checkouts": self.checkouts,
+                "checkout_failures": dict(self.checkout_failures),
+                "exhausted": self.exhausted,
+                "pool_clears": self.pool_clears,
+                "checkout_wait": self._checkout_wait.stats(),
+            }
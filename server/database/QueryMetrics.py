@@ -0,0 +1,185 @@
+import json
+import time
+import bson
+
+from config.config import SLOW_QUERY_MS
+from helpers.LatencyHistogram import LatencyHistogram
+
+
+def query_shape(value):
+    """
+    Replace every literal in a query/update document with "?" while keeping field
+    names and operators, so slow queries can be logged without leaking user data.
+    """
+    if isinstance(value, dict):
+        return {key: query_shape(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        if any(isinstance(item, (dict, list, tuple)) for item in value):
+            return [query_shape(item) for item in value]
+        return ["?"] if value else []
+    return "?"
+
+
+def document_size(document):
+    """BSON size of a document in bytes (0 if it cannot be encoded)"""
+    try:
+        return len(bson.encode(document))
+    except Exception:
+        return 0
+
+
+class _Operation:
+    """Handle yielded by QueryMetrics.track(); callers fill in documents and bytes"""
+    __slots__ = ("documents", "bytes")
+
+    def __init__(self):
+        self.documents = 0
+        self.bytes = 0
+
+
+class _Tracker:
+    __slots__ = ("metrics", "collection_name", "operation", "query", "started", "handle")
+
+    def __init__(self, metrics, collection_name, operation, query):
+        self.metrics = metrics
+        self.collection_name = collection_name
+        self.operation = operation
+        self.query = query
+        self.handle = _Operation()
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self.handle
+
+    def __exit__(self, exc_type, exc, tb):
+        elapsed_ms = (time.perf_counter() - self.started) * 1000
+        self.metrics.record(
+            self.collection_name, self.operation, elapsed_ms,
+            documents=self.handle.documents, nbytes=self.handle.bytes,
+            query=self.query, error=exc_type is not None
+        )
+        return False
+
+
+class QueryMetrics:
+    """
+    Per (collection, operation) latency histograms plus call, error, document and
+    byte counters for every round trip the Database wrapper makes. Operations
+    slower than slow_ms are printed with their query shape (values masked).
+    """
+    def __init__(self, slow_ms=SLOW_QUERY_MS):
+        self.slow_ms = slow_ms
+        self._operations = {}
+        self.slow_queries = 0
+
+    def track(self, collection_name, operation, query=None):
+        """Context manager timing one database round trip"""
+        return _Tracker(self, collection_name, operation, query)
+
+    def record(self, collection_name, operation, elapsed_ms, documents=0, nbytes=0, query=None, error=False):
+        key = (collection_name, operation)
+        entry = self._operations.get(key)
+        if entry is None:
+            entry = self._operations[key] = {
+                "latency": LatencyHistogram(), "errors": 0, "documents": 0, "bytes": 0
+            }
+        entry["latency"].observe(elapsed_ms)
+        entry["documents"] += documents
+        entry["bytes"] += nbytes
+        if error:
+            entry["errors"] += 1
+
+        if self.slow_ms and elapsed_ms >= self.slow_ms:
+            self.slow_queries += 1
+            shape = json.dumps(query_shape(query), default=str) if query is not None else "-"
+            print(f"Slow query: {collection_name}.{operation} took {elapsed_ms:.1f} ms "
+                  f"({documents} docs, {nbytes} bytes) shape={shape}")
+
+    def operations(self):
+        """(collection, operation) -> {"latency", "errors", "documents", "bytes"}, for exporters"""
+        return dict(self._operations)
+
+    def stats(self):
+        return {
+            f"{collection_name}.{operation}": {
+                **entry["latency"].stats(),
+                "errors": entry["errors"],
+                "documents": entry["documents"],
+                "bytes": entry["bytes"],
+            }
+            for (collection_name, operation), entry in sorted(self._operations.items())
+        }
+
+
+class InstrumentedCollection:
+    """
+    Proxy returned by Database.get_collection(): awaitable collection methods are
+    timed like the wrapper's own operations; cursors from find()/aggregate() are
+    timed when drained with to_list(). Everything else passes straight through.
+    """
+    _TIMED = {
+        "find_one", "insert_one", "insert_many", "update_one", "update_many", "replace_one",
+        "delete_one", "delete_many", "count_documents", "distinct", "bulk_write",
+        "find_one_and_update", "find_one_and_delete", "find_one_and_replace",
+    }
+    _CURSORS = {"find", "aggregate"}
+
+    def __init__(self, collection, metrics):
+        self._collection = collection
+        self._metrics = metrics
+
+    def __getattr__(self, name):
+        attribute = getattr(self._collection, name)
+        if name in self._TIMED:
+            return self._timed(name, attribute)
+        if name in self._CURSORS:
+            return self._cursor(name, attribute)
+        return attribute
+
+    def __getitem__(self, name):
+        return InstrumentedCollection(self._collection[name], self._metrics)
+
+    def _timed(self, name, method):
+        async def call(*args, **kwargs):
+            query = args[0] if args and isinstance(args[0], dict) else kwargs.get("filter")
+            with self._metrics.track(self._collection.name, name, query) as op:
+                result = await method(*args, **kwargs)
+                if isinstance(result, dict):
+                    op.documents = 1
+                    op.bytes = document_size(result)
+                return result
+        return call
+
+    def _cursor(self, name, method):
+        def call(*args, **kwargs):
+            query = args[0] if args else kwargs.get("filter", kwargs.get("pipeline"))
+            return _InstrumentedCursor(method(*args, **kwargs), self._metrics, self._collection.name, name, query)
+        return call
+
+
+class _InstrumentedCursor:
+    def __init__(self, cursor, metrics, collection_name, operation, query):
+        self._cursor = cursor
+        self._metrics = metrics
+        self._collection_name = collection_name
+        self._operation = operation
+        self._query = query
+
+    def __getattr__(self, name):
+        attribute = getattr(self._cursor, name)
+        if name in ("sort", "limit", "skip", "batch_size", "hint", "max_time_ms"):
+            def chain(*args, **kwargs):
+                attribute(*args, **kwargs)
+                return self
+            return chain
+        return attribute
+
+    def __aiter__(self):
+        return self._cursor.__aiter__()
+
+    async def to_list(self, length=None):
+        with self._metrics.track(self._collection_name, self._operation, self._query) as op:
+            documents = await self._cursor.to_list(length)
+            op.documents = len(documents)
+            op.bytes = sum(document_size(document) for document in documents)
+            return documents
@@ -0,0 +1,76 @@
+from abc import ABC, abstractmethod
+from urllib.parse import urlsplit, urlunsplit
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from .MemoryEngine import MemoryClient
+
+
+class StorageBackend(ABC):
+    """
+    Creates the client the Database wrapper talks to. Every backend hands out
+    objects with the Motor collection API, so the wrapper does not care which
+    one is in use.
+    """
+    scheme = None
+
+    def __init__(self, uri):
+        self.uri = uri
+
+    @abstractmethod
+    def create_client(self, event_listeners=None, **options):
+        """A client whose databases hand out collections with the Motor API"""
+
+    @property
+    def srv_host(self):
+        """Host whose DNS SRV records must resolve before connecting, if any"""
+        return None
+
+    def describe(self):
+        """The URI with the password masked, for logs"""
+        parts = urlsplit(self.uri)
+        userinfo, at, hosts = parts.netloc.rpartition("@")
+        if not at or ":" not in userinfo:
+            return self.uri
+        # netloc may list several hosts, so it is rebuilt by hand rather than via parts.port
+        netloc = f"{userinfo.split(':', 1)[0]}:***@{hosts}"
+        return urlunsplit(parts._replace(netloc=netloc))
+
+
+class MotorBackend(StorageBackend):
+    """MongoDB through Motor: Atlas (mongodb+srv://) or a plain mongod (mongodb://)"""
+    scheme = "mongodb"
+
+    def create_client(self, event_listeners=None, **options):
+        return AsyncIOMotorClient(self.uri, event_listeners=event_listeners or [], **options)
+
+    @property
+    def srv_host(self):
+        parts = urlsplit(self.uri)
+        return parts.hostname if parts.scheme == "mongodb+srv" else None
+
+
+class MemoryBackend(StorageBackend):
+    """
+    In-process engine (memory://) for tests, local development and benchmarks.
+    Data lives as long as the client; pool options and listeners do not apply.
+    """
+    scheme = "memory"
+
+    def create_client(self, event_listeners=None, **options):
+        return MemoryClient()
+
+
+BACKENDS = {
+    "mongodb": MotorBackend,
+    "mongodb+srv": MotorBackend,
+    "memory": MemoryBackend,
+}
+
+
+def create_backend(uri):
+    """Pick the storage backend for a connection URI by its scheme"""
+    scheme = urlsplit(uri).scheme
+    backend = BACKENDS.get(scheme)
+    if backend is None:
+        raise ValueError(f"Unsupported database URI scheme '{scheme}', expected one of: {', '.join(BACKENDS)}")
+    return backend(uri)
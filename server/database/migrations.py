@@ -0,0 +1,64 @@
+"""
+One-shot data migrations.
+
+Run from the server directory, e.g.:
+    python -m database.migrations backfill_team_codes
+"""
+import asyncio
+import sys
+from pymongo import UpdateOne
+
+from database.DB import Database
+from helpers.QRCodeGenerator import generate_team_qr_id, generate_team_join_code
+
+
+async def backfill_team_codes(db, batch_size=500):
+    """
+    Store qr_id and join_code on every team that predates them, then build the
+    unique indexes so that join/scan lookups never need to recompute codes.
+    """
+    result = await db.find_many(
+        "teams",
+        {"$or": [{"qr_id": {"$in": [None, ""]}}, {"join_code": {"$in": [None, ""]}}]},
+        projection={"team_id": 1, "team_name": 1, "qr_id": 1, "join_code": 1},
+        cache=False
+    )
+    teams = result["data"]
+
+    operations = []
+    for team in teams:
+        operations.append(UpdateOne(
+            {"team_id": team["team_id"]},
+            {"$set": {
+                "qr_id": team.get("qr_id") or generate_team_qr_id(team["team_id"]),
+                "join_code": team.get("join_code") or generate_team_join_code(team["team_id"], team["team_name"])
+            }}
+        ))
+
+    updated = 0
+    for start in range(0, len(operations), batch_size):
+        write_result = await db.bulk_write("teams", operations[start:start + batch_size])
+        updated += write_result["modified_count"]
+
+    print(f"Backfilled codes on {updated} of {len(teams)} teams missing them")
+    report = await db.ensure_indexes()
+    return {"teams_missing_codes": len(teams), "updated": updated, "index_report": report}
+
+
+MIGRATIONS = {
+    "backfill_team_codes": backfill_team_codes,
+}
+
+
+async def main(name):
+    db = Database()
+    db.check_connection()
+    db.connect()
+    await MIGRATIONS[name](db)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2 or sys.argv[1] not in MIGRATIONS:
+        print(f"Usage: python -m database.migrations <{'|'.join(MIGRATIONS)}>")
+        sys.exit(1)
+    asyncio.run(main(sys.argv[1]))
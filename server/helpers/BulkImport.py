@@ -0,0 +1,52 @@
+import csv
+import io
+import json
+
+MAX_IMPORT_ROWS = 5000
+
+
+async def read_import_rows(request, max_rows: int = MAX_IMPORT_ROWS):
+    """
+    Read bulk-import rows from a request body.
+    text/csv bodies are parsed with a header row; anything else must be JSON,
+    either a list of objects or {"rows": [...]}. Raises ValueError on bad input.
+    """
+    body = await request.body()
+    content_type = request.headers.get("content-type", "")
+
+    if "csv" in content_type:
+        try:
+            text = body.decode("utf-8-sig")
+        except UnicodeDecodeError:
+            raise ValueError("CSV body must be UTF-8 encoded")
+        reader = csv.DictReader(io.StringIO(text))
+        rows = [{key.strip(): (value or "").strip() for key, value in row.items() if key} for row in reader]
+    else:
+        try:
+            data = json.loads(body or b"null")
+        except ValueError:
+            raise ValueError("Body must be a JSON list of rows or CSV with Content-Type: text/csv")
+        rows = data.get("rows") if isinstance(data, dict) else data
+        if not isinstance(rows, list) or not all(isinstance(row, dict) for row in rows):
+            raise ValueError("Body must be a JSON list of objects or {\"rows\": [...]}")
+
+    if not rows:
+        raise ValueError("No rows to import")
+    if len(rows) > max_rows:
+        raise ValueError(f"At most {max_rows} rows per import")
+    return rows
+
+
+def validation_error(error) -> str:
+    """Short message for a pydantic ValidationError"""
+    return "; ".join(
+        f"{'.'.join(str(part) for part in item['loc'])}: {item['msg']}" for item in error.errors()
+    )
+
+
+def count_statuses(results) -> dict:
+    """Number of rows per outcome status"""
+    counts = {}
+    for result in results:
+        counts[result["status"]] = counts.get(result["status"], 0) + 1
+    return counts
@@ -0,0 +1,140 @@
+import asyncio
+import signal
+import threading
+
+from .FastJSONResponse import dumps
+
+# Signals the ASGI server treats as a request to shut down
+SHUTDOWN_SIGNALS = (signal.SIGINT, signal.SIGTERM)
+
+
+class Subscription:
+    """A single Server-Sent Events client with its own bounded queue"""
+    def __init__(self, queue_size: int):
+        self.queue = asyncio.Queue(maxsize=queue_size)
+        self.lagged = False
+
+
+class EventBroadcaster:
+    """
+    Fan-out of Server-Sent Events to many idle clients.
+    Each message is serialized once and queued per client. A client whose queue
+    fills up (slow reader) has its backlog dropped and is flagged as lagged so
+    that it can be sent a fresh snapshot instead of an ever-growing backlog.
+    Snapshots are serialized once per data version and shared by every client
+    that needs one.
+    """
+    _CLOSED = object()
+
+    def __init__(self, max_clients: int = 1000, queue_size: int = 64):
+        self.max_clients = max_clients
+        self.queue_size = queue_size
+        self._subscriptions = set()
+        self._snapshot = None  # (version, serialized snapshot message)
+        self.published = 0
+        self.dropped = 0
+        self.rejected = 0
+
+    def __len__(self):
+        return len(self._subscriptions)
+
+    @staticmethod
+    def format(event: str, data) -> str:
+        return f"event: {event}\ndata: {dumps(data).decode()}\n\n"
+
+    def snapshot(self, version, build):
+        """Serialized snapshot event for a data version; build() is only called when the version changed"""
+        if self._snapshot is None or self._snapshot[0] != version:
+            self._snapshot = (version, self.format("snapshot", build()))
+        return self._snapshot[1]
+
+    def admit(self):
+        """Whether a new client fits under the per-worker cap; a refusal counts as a rejection"""
+        if len(self._subscriptions) >= self.max_clients:
+            self.rejected += 1
+            return False
+        return True
+
+    def subscribe(self):
+        """Register a client, or return None when the per-worker cap is reached"""
+        if len(self._subscriptions) >= self.max_clients:
+            self.rejected += 1
+            return None
+        subscription = Subscription(self.queue_size)
+        self._subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        self._subscriptions.discard(subscription)
+
+    def publish(self, event: str, data):
+        if not self._subscriptions:
+            return
+        message = self.format(event, data)
+        self.published += 1
+        for subscription in self._subscriptions:
+            try:
+                subscription.queue.put_nowait(message)
+            except asyncio.QueueFull:
+                while not subscription.queue.empty():
+                    subscription.queue.get_nowait()
+                subscription.lagged = True
+                self.dropped += 1
+
+    async def next_message(self, subscription, timeout: float):
+        """Next queued message, None on timeout (heartbeat due), or CLOSED on shutdown"""
+        try:
+            return await asyncio.wait_for(subscription.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def close(self):
+        """Ask every connected client stream to finish"""
+        for subscription in self._subscriptions:
+            while not subscription.queue.empty():
+                subscription.queue.get_nowait()
+            subscription.queue.put_nowait(self._CLOSED)
+
+    def close_on_signals(self, signals=SHUTDOWN_SIGNALS):
+        """
+        Close every stream as soon as the process is asked to exit, then hand
+        the signal on to the handler installed before (the server's). Uvicorn
+        waits for open responses to finish before running the lifespan shutdown,
+        and an event stream never finishes by itself. Returns a function that
+        puts the previous handlers back. Only the main thread may set handlers,
+        so anywhere else (e.g. a TestClient portal) this does nothing.
+        """
+        if threading.current_thread() is not threading.main_thread():
+            return lambda: None
+        loop = asyncio.get_running_loop()
+        previous = {}
+
+        def handle(signum, frame):
+            loop.call_soon_threadsafe(self.close)
+            handler = previous[signum]
+            if callable(handler):
+                handler(signum, frame)
+            elif handler == signal.SIG_DFL:
+                signal.signal(signum, signal.SIG_DFL)
+                signal.raise_signal(signum)
+
+        for signum in signals:
+            previous[signum] = signal.signal(signum, handle)
+
+        def restore():
+            for signum, handler in previous.items():
+                if signal.getsignal(signum) is handle:
+                    signal.signal(signum, handler)
+        return restore
+
+    def is_closed(self, message):
+        return message is self._CLOSED
+
+    def stats(self):
+        return {
+            "clients": len(self._subscriptions),
+            "max_clients": self.max_clients,
+            "published": self.published,
+            "dropped": self.dropped,
+            "rejected": self.rejected
+        }
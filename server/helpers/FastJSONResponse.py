@@ -0,0 +1,34 @@
+import json
+from datetime import date, datetime
+from bson import ObjectId
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is optional, stdlib json is the fallback
+    orjson = None
+
+
+def _default(obj):
+    """Encode the non-JSON types found in MongoDB documents"""
+    if isinstance(obj, ObjectId):
+        return str(obj)
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(content) -> bytes:
+    """
+    Encode content to JSON bytes. datetime (as ISO 8601, same as isoformat())
+    and ObjectId values are encoded directly, without a pre-serialization pass.
+    """
+    if orjson is not None:
+        return orjson.dumps(content, default=_default)
+    return json.dumps(content, default=_default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse that encodes raw MongoDB documents with orjson when available"""
+    def render(self, content) -> bytes:
+        return dumps(content)
@@ -0,0 +1,235 @@
+import asyncio
+import hashlib
+from datetime import datetime, timedelta
+
+from pymongo.errors import DuplicateKeyError
+
+from .FastJSONResponse import FastJSONResponse
+from .TTLCache import TTLCache
+
+IDEMPOTENCY_HEADER = b"idempotency-key"
+REPLAYED_HEADER = (b"idempotent-replayed", b"true")
+MAX_KEY_LENGTH = 255
+IDEMPOTENCY_COLLECTION = "idempotency_keys"
+
+# Responses that say the request was never processed are not kept, so a retry
+# with the same key runs again: server errors, auth failures and rate limiting
+UNCACHED_STATUSES = {401, 403, 429}
+
+
+def _cacheable(status):
+    return status < 500 and status not in UNCACHED_STATUSES
+
+
+class MemoryIdempotencyStore:
+    """Completed responses kept in this process only, LRU bounded with a TTL"""
+    def __init__(self, ttl_seconds, max_entries):
+        self._cache = TTLCache(max_entries=max_entries, ttl_seconds=ttl_seconds)
+
+    async def get(self, key):
+        return self._cache.get(key)
+
+    async def set(self, key, record):
+        self._cache.set(key, record)
+
+    def stats(self):
+        return self._cache.stats()
+
+
+class MongoIdempotencyStore:
+    """
+    Completed responses in a collection shared by every worker. Documents are
+    removed by a TTL index on created_at; since the TTL monitor only runs once
+    a minute, expiry is checked on read as well.
+    """
+    def __init__(self, db, ttl_seconds):
+        self.db = db
+        self.ttl_seconds = ttl_seconds
+
+    async def get(self, key):
+        document = await self.db.find_one(IDEMPOTENCY_COLLECTION, {"_id": key}, cache=False)
+        if document is None:
+            return None
+        if document["created_at"] + timedelta(seconds=self.ttl_seconds) <= datetime.utcnow():
+            return None
+        return {
+            "fingerprint": document["fingerprint"],
+            "status": document["status"],
+            "headers": [(name.encode("latin-1"), value.encode("latin-1")) for name, value in document["headers"]],
+            "body": bytes(document["body"]),
+        }
+
+    async def set(self, key, record):
+        try:
+            await self.db.add(IDEMPOTENCY_COLLECTION, {
+                "_id": key,
+                "fingerprint": record["fingerprint"],
+                "status": record["status"],
+                "headers": [[name.decode("latin-1"), value.decode("latin-1")] for name, value in record["headers"]],
+                "body": record["body"],
+                "created_at": datetime.utcnow(),
+            })
+        except DuplicateKeyError:
+            # Another worker completed the same key first; its response stands
+            pass
+
+    def stats(self):
+        return {}
+
+
+def create_idempotency_store(kind, db, ttl_seconds, max_entries):
+    if kind == "memory":
+        return MemoryIdempotencyStore(ttl_seconds, max_entries)
+    if kind == "mongo":
+        return MongoIdempotencyStore(db, ttl_seconds)
+    raise ValueError(f"Unknown IDEMPOTENCY_STORE '{kind}', expected 'memory' or 'mongo'")
+
+
+class IdempotencyStats:
+    """Counters shared between IdempotencyMiddleware and the metrics endpoint"""
+    def __init__(self):
+        self.in_flight = 0
+        self.replays = 0
+        self.coalesced = 0
+        self.mismatches = 0
+        self.stored = 0
+
+    def stats(self):
+        return {
+            "in_flight": self.in_flight,
+            "replays": self.replays,
+            "coalesced": self.coalesced,
+            "mismatches": self.mismatches,
+            "stored": self.stored,
+        }
+
+
+class IdempotencyMiddleware:
+    """
+    Pure ASGI middleware honouring an Idempotency-Key header on the given POST
+    paths. The first request with a key runs normally and its response is stored
+    under (user, path, key); a replay gets the stored response back with an
+    Idempotent-Replayed header, without running the handler again. A replay
+    arriving while the first request is still running waits for it. Reusing a
+    key with a different body is rejected with 422.
+
+    It sits inside SessionMiddleware, since keys are scoped by the session
+    user, and looks up the store on app.state so it can be created in lifespan.
+    Requests without a key or without a session user pass straight through.
+    """
+    def __init__(self, app, paths, stats: IdempotencyStats):
+        self.app = app
+        self.paths = frozenset(paths)
+        self.stats = stats
+        self._in_flight = {}  # scoped key -> (fingerprint, done event, outcome)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "POST" or scope["path"] not in self.paths:
+            await self.app(scope, receive, send)
+            return
+
+        key = next((value for name, value in scope["headers"] if name == IDEMPOTENCY_HEADER), None)
+        store = getattr(scope["app"].state, "idempotency_store", None)
+        user = (scope.get("session") or {}).get("user")
+        if key is None or store is None or not user:
+            await self.app(scope, receive, send)
+            return
+        if not key or len(key) > MAX_KEY_LENGTH:
+            await FastJSONResponse(status_code=400, content={
+                "detail": f"Idempotency-Key must be 1 to {MAX_KEY_LENGTH} characters"
+            })(scope, receive, send)
+            return
+
+        body = await self._read_body(receive)
+        fingerprint = hashlib.sha256(body).hexdigest()
+        scoped = hashlib.sha256(b"\0".join([user["email"].lower().encode(), scope["path"].encode(), key])).hexdigest()
+
+        while True:
+            pending = self._in_flight.get(scoped)
+            if pending is not None:
+                fingerprint_in_flight, done, outcome = pending
+                if fingerprint_in_flight != fingerprint:
+                    await self._mismatch(scope, receive, send)
+                    return
+                # Same request still running here; replay its response once it is
+                # done, or run it again if that attempt ended in an uncached error
+                self.stats.coalesced += 1
+                await done.wait()
+                if outcome.get("record") is not None:
+                    await self._replay(outcome["record"], fingerprint, scope, receive, send)
+                    return
+                continue
+            record = await store.get(scoped)
+            if record is not None:
+                await self._replay(record, fingerprint, scope, receive, send)
+                return
+            if scoped not in self._in_flight:
+                break
+
+        done = asyncio.Event()
+        outcome = {}
+        self._in_flight[scoped] = (fingerprint, done, outcome)
+        self.stats.in_flight += 1
+        response = {"status": None, "headers": [], "body": []}
+
+        async def replay_receive():
+            nonlocal body
+            if body is not None:
+                message = {"type": "http.request", "body": body, "more_body": False}
+                body = None
+                return message
+            return await receive()
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                response["status"] = message["status"]
+                response["headers"] = list(message.get("headers", ()))
+            elif message["type"] == "http.response.body":
+                response["body"].append(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, replay_receive, send_wrapper)
+            if response["status"] is not None and _cacheable(response["status"]):
+                outcome["record"] = {
+                    "fingerprint": fingerprint,
+                    "status": response["status"],
+                    "headers": response["headers"],
+                    "body": b"".join(response["body"]),
+                }
+                try:
+                    await store.set(scoped, outcome["record"])
+                    self.stats.stored += 1
+                except Exception as e:
+                    print(f"Could not store idempotent response: {e}")
+        finally:
+            del self._in_flight[scoped]
+            self.stats.in_flight -= 1
+            done.set()
+
+    @staticmethod
+    async def _read_body(receive):
+        chunks = []
+        more_body = True
+        while more_body:
+            message = await receive()
+            if message["type"] != "http.request":
+                break
+            chunks.append(message.get("body", b""))
+            more_body = message.get("more_body", False)
+        return b"".join(chunks)
+
+    async def _mismatch(self, scope, receive, send):
+        self.stats.mismatches += 1
+        await FastJSONResponse(status_code=422, content={
+            "detail": "Idempotency-Key was already used with a different request body"
+        })(scope, receive, send)
+
+    async def _replay(self, record, fingerprint, scope, receive, send):
+        if record["fingerprint"] != fingerprint:
+            await self._mismatch(scope, receive, send)
+            return
+        self.stats.replays += 1
+        await send({"type": "http.response.start", "status": record["status"],
+                    "headers": list(record["headers"]) + [REPLAYED_HEADER]})
+        await send({"type": "http.response.body", "body": record["body"]})
@@ -0,0 +1,70 @@
+from bisect import bisect_left
+
+# Upper bounds in milliseconds, roughly logarithmic from sub-millisecond cache hits
+# up to slow Atlas round trips; everything above the last bound lands in +Inf
+DEFAULT_BUCKETS_MS = (0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+class LatencyHistogram:
+    """
+    Fixed-bucket latency histogram. Recording is a bisect and two increments,
+    so it is cheap enough to leave on for every request and query. Quantiles
+    are estimated by linear interpolation inside the bucket that holds them.
+    """
+    def __init__(self, buckets=DEFAULT_BUCKETS_MS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value_ms):
+        self.counts[bisect_left(self.buckets, value_ms)] += 1
+        self.count += 1
+        self.sum += value_ms
+        if value_ms > self.max:
+            self.max = value_ms
+
+    def copy(self):
+        clone = LatencyHistogram(self.buckets)
+        clone.counts = list(self.counts)
+        clone.count = self.count
+        clone.sum = self.sum
+        clone.max = self.max
+        return clone
+
+    def cumulative(self):
+        """(upper_bound, cumulative_count) pairs ending with ("+Inf", count), as Prometheus expects"""
+        total = 0
+        result = []
+        for bound, count in zip(self.buckets + ("+Inf",), self.counts):
+            total += count
+            result.append((bound, total))
+        return result
+
+    def quantile(self, q):
+        if self.count == 0:
+            return None
+        rank = q * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            if count and seen + count >= rank:
+                lower = self.buckets[index - 1] if index > 0 else 0.0
+                upper = self.buckets[index] if index < len(self.buckets) else self.max
+                return min(lower + (upper - lower) * (rank - seen) / count, self.max)
+            seen += count
+        return self.max
+
+    def stats(self):
+        return {
+            "count": self.count,
+            "sum_ms": round(self.sum, 3),
+            "max_ms": round(self.max, 3),
+            "p50_ms": self._rounded(0.5),
+            "p95_ms": self._rounded(0.95),
+            "p99_ms": self._rounded(0.99),
+        }
+
+    def _rounded(self, q):
+        value = self.quantile(q)
+        return None if value is None else round(value, 3)
@@ -0,0 +1,23 @@
+from .FastJSONResponse import dumps
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+def wants_ndjson(request) -> bool:
+    """True if the client opted into newline-delimited JSON via the Accept header"""
+    accept = request.headers.get("accept", "")
+    return NDJSON_MEDIA_TYPE in accept or "application/ndjson" in accept
+
+
+async def ndjson_stream(documents, transform=None):
+    """Encode an (async) iterable of documents as NDJSON, one line per document"""
+    if hasattr(documents, "__aiter__"):
+        async for document in documents:
+            if transform:
+                document = transform(document)
+            yield dumps(document) + b"\n"
+    else:
+        for document in documents:
+            if transform:
+                document = transform(document)
+            yield dumps(document) + b"\n"
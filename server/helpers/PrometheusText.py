@@ -0,0 +1,71 @@
+PROMETHEUS_MEDIA_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + "}"
+
+
+def _number(value):
+    if value is None:
+        return "NaN"
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+class PrometheusText:
+    """
+    Minimal writer for the Prometheus text exposition format. Each metric family
+    is declared once with add(); samples are appended to it and render() emits
+    the families in declaration order.
+    """
+    def __init__(self):
+        self._families = {}
+
+    def add(self, name, metric_type, help_text):
+        if name not in self._families:
+            self._families[name] = {"type": metric_type, "help": help_text, "samples": []}
+        return self
+
+    def sample(self, name, value, labels=None, suffix=""):
+        self._families[name]["samples"].append(f"{name}{suffix}{_labels(labels)} {_number(value)}")
+        return self
+
+    def histogram(self, name, histogram, labels=None, scale=0.001):
+        """
+        Append a LatencyHistogram (milliseconds) as a Prometheus histogram; scale
+        converts bucket bounds and the sum to the family's unit (seconds by default).
+        """
+        labels = labels or {}
+        for bound, count in histogram.cumulative():
+            le = bound if bound == "+Inf" else _number(round(bound * scale, 6))
+            self.sample(name, count, {**labels, "le": le}, suffix="_bucket")
+        self.sample(name, round(histogram.sum * scale, 6), labels, suffix="_sum")
+        self.sample(name, histogram.count, labels, suffix="_count")
+        return self
+
+    def quantiles(self, name, histogram, labels=None, scale=0.001):
+        """Append estimated quantiles of a LatencyHistogram as gauge samples"""
+        labels = labels or {}
+        for q in QUANTILES:
+            value = histogram.quantile(q)
+            self.sample(name, None if value is None else round(value * scale, 6), {**labels, "quantile": q})
+        return self
+
+    def render(self):
+        lines = []
+        for name, family in self._families.items():
+            lines.append(f"# HELP {name} {family['help']}")
+            lines.append(f"# TYPE {name} {family['type']}")
+            lines.extend(family["samples"])
+        return "\n".join(lines) + "\n"
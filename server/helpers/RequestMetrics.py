@@ -0,0 +1,102 @@
+import time
+
+from .LatencyHistogram import LatencyHistogram
+
+# Label used for requests that did not match any route, so that scans of random
+# URLs cannot create an unbounded number of series
+UNMATCHED_ROUTE = "unmatched"
+
+
+def route_template(scope):
+    """
+    Route template of a routed request, e.g. /api/volunteer/{roll_number}. The
+    matched route's path may be relative to its router's prefix, so the template
+    replaces only as many trailing path segments as it has; the leading ones are
+    the prefix. Every route here maps one template segment to one path segment.
+    """
+    route = scope.get("route")
+    if route is None and scope.get("endpoint") is None:
+        return UNMATCHED_ROUTE
+    template = getattr(route, "path_format", None)
+    if not scope.get("path_params") or template is None:
+        return scope["path"]
+    template_segments = template.lstrip("/").split("/")
+    path_segments = scope["path"].split("/")
+    return "/".join(path_segments[:len(path_segments) - len(template_segments)] + template_segments)
+
+
+class RequestMetrics:
+    """
+    Request counters, in-flight gauges and latency histograms per route template.
+    Everything runs on the event loop thread, so plain integer updates are safe
+    without locks.
+    """
+    def __init__(self):
+        self._latency = {}  # (method, route) -> LatencyHistogram
+        self._responses = {}  # (method, route, status) -> count
+        self.in_flight = 0
+        self.streams_open = 0
+
+    def observe(self, method, route, status, elapsed_ms):
+        key = (method, route, status)
+        self._responses[key] = self._responses.get(key, 0) + 1
+        if elapsed_ms is not None:
+            histogram = self._latency.get((method, route))
+            if histogram is None:
+                histogram = self._latency[(method, route)] = LatencyHistogram()
+            histogram.observe(elapsed_ms)
+
+    def responses(self):
+        """(method, route, status) -> request count"""
+        return dict(self._responses)
+
+    def histograms(self):
+        """(method, route) -> LatencyHistogram"""
+        return dict(self._latency)
+
+    def stats(self):
+        return {
+            "in_flight": self.in_flight,
+            "streams_open": self.streams_open,
+            "routes": {f"{method} {route}": histogram.stats() for (method, route), histogram in sorted(self._latency.items())}
+        }
+
+
+class RequestMetricsMiddleware:
+    """
+    Pure ASGI middleware feeding RequestMetrics. The route template is resolved
+    after routing, so /api/volunteer/{roll_number} is one series.
+    Server-Sent Events responses are counted but kept out of the latency
+    histograms, since their duration is the length of the client's session.
+    """
+    def __init__(self, app, metrics: RequestMetrics):
+        self.app = app
+        self.metrics = metrics
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        metrics = self.metrics
+        started = time.perf_counter()
+        response = {"status": 500, "stream": False}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                response["status"] = message["status"]
+                for name, value in message.get("headers", ()):
+                    if name.lower() == b"content-type" and value.startswith(b"text/event-stream"):
+                        response["stream"] = True
+                        metrics.streams_open += 1
+            await send(message)
+
+        metrics.in_flight += 1
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            metrics.in_flight -= 1
+            if response["stream"]:
+                metrics.streams_open -= 1
+            elapsed_ms = None if response["stream"] else (time.perf_counter() - started) * 1000
+            metrics.observe(scope["method"], route_template(scope), response["status"], elapsed_ms)
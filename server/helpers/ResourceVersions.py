@@ -0,0 +1,47 @@
+import uuid
+from collections import defaultdict
+
+
+class ResourceVersions:
+    """
+    Per-resource version counters used to build strong ETags.
+    Every write that changes a resource bumps its counter; the process boot id
+    is part of the tag so counters from different workers never collide.
+    Counters only suit data this process holds itself (the materialized
+    leaderboard); lists read from the database are tagged with shared_etag
+    from a version stored alongside them, since writes made by other workers
+    never bump this worker's counter.
+    """
+    def __init__(self):
+        self._boot_id = uuid.uuid4().hex[:12]
+        self._versions = defaultdict(int)
+
+    def bump(self, *resources):
+        for resource in resources:
+            self._versions[resource] += 1
+
+    def version(self, resource):
+        return self._versions[resource]
+
+    def etag(self, resource):
+        return f'"{self._boot_id}-{resource}-{self._versions[resource]}"'
+
+    @staticmethod
+    def shared_etag(resource, version):
+        """Strong ETag for a version counter stored in the database, the same on every worker"""
+        return f'"{resource}-v{version}"'
+
+    @staticmethod
+    def matches(if_none_match, etag):
+        """Evaluate an If-None-Match header value against an ETag"""
+        if not if_none_match:
+            return False
+        for candidate in if_none_match.split(","):
+            candidate = candidate.strip()
+            if candidate == "*":
+                return True
+            if candidate.startswith("W/"):
+                candidate = candidate[2:]
+            if candidate == etag:
+                return True
+        return False
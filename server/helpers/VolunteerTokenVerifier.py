@@ -0,0 +1,75 @@
+import hashlib
+import time
+from datetime import datetime, timedelta
+
+from jose import jwt, JWTError
+
+from .TTLCache import TTLCache
+
+ALGORITHM = "HS256"
+TOKEN_EXPIRE_MINUTES = 180
+
+
+class VolunteerTokenVerifier:
+    """
+    Issues and verifies the event-bound JWTs volunteers scan with.
+
+    The same token is presented on every scan for its whole life, so tokens that
+    verified once are remembered in an LRU keyed by the token's SHA-256 digest;
+    later scans skip the HMAC check and only re-check exp. Forged or malformed
+    tokens are never cached.
+
+    Revocation lives on the event document: accepts() rejects tokens whose iat
+    (kept to sub-second precision) precedes the event's tokens_valid_after, set
+    when the event expires or its secret code rotates. Workers read the event
+    through their EventCache, so the worker that made the change rejects the
+    old tokens at once and the others within one event cache TTL.
+    """
+    def __init__(self, secret_key, max_entries=4096, expire_minutes=TOKEN_EXPIRE_MINUTES, clock=time.time):
+        self.secret_key = secret_key
+        self.expire_minutes = expire_minutes
+        self._clock = clock
+        self._verified = TTLCache(max_entries=max_entries, ttl_seconds=expire_minutes * 60)
+        self.rejected = 0
+        self.revoked_rejections = 0
+
+    def create(self, volunteer_email, event_id):
+        issued_at = self._clock()
+        payload = {
+            "sub": volunteer_email,
+            "event_id": event_id,
+            # A datetime would be truncated to whole seconds
+            "iat": issued_at,
+            "exp": datetime.utcfromtimestamp(issued_at) + timedelta(minutes=self.expire_minutes)
+        }
+        return jwt.encode(payload, self.secret_key, algorithm=ALGORITHM)
+
+    def verify(self, token):
+        """The token's claims, or None if it is invalid or expired"""
+        digest = hashlib.sha256(token.encode()).digest()
+        payload = self._verified.get(digest)
+        if payload is None:
+            try:
+                payload = jwt.decode(token, self.secret_key, algorithms=[ALGORITHM])
+            except JWTError:
+                self.rejected += 1
+                return None
+            self._verified.set(digest, payload)
+
+        if payload["exp"] <= self._clock():
+            self._verified.invalidate(digest)
+            self.rejected += 1
+            return None
+        return dict(payload)
+
+    def accepts(self, payload, event):
+        """Whether verified claims were issued after their event last revoked its tokens"""
+        valid_after = event.get("tokens_valid_after")
+        # Tokens issued before iat was added carry none and count as issued at 0
+        if valid_after is not None and payload.get("iat", 0) < valid_after:
+            self.revoked_rejections += 1
+            return False
+        return True
+
+    def stats(self):
+        return self._verified.stats()
@@ -1,10 +1,37 @@
 from .DateTimeSerializer import DateTimeSerializerVisitor
 from .QRCodeGenerator import generate_team_qr_id, generate_team_join_code
 from .SecretCodeEncryptionStrategy import SecretCodeEncryptionStrategy
+from .TTLCache import TTLCache
+from .ResourceVersions import ResourceVersions
+from .EventBroadcaster import EventBroadcaster
+from .FastJSONResponse import FastJSONResponse
+from .BulkImport import read_import_rows
+from .LatencyHistogram import LatencyHistogram
+from .RequestMetrics import RequestMetrics, RequestMetricsMiddleware
+from .PrometheusText import PrometheusText
+from .NDJSONStream import NDJSON_MEDIA_TYPE, wants_ndjson, ndjson_stream
+from .Idempotency import IdempotencyMiddleware, IdempotencyStats, create_idempotency_store
+from .VolunteerTokenVerifier import VolunteerTokenVerifier
 
 __all__ = [
     'DateTimeSerializerVisitor',
     'generate_team_qr_id',
     'generate_team_join_code',
-    'SecretCodeEncryptionStrategy'
+    'SecretCodeEncryptionStrategy',
+    'TTLCache',
+    'ResourceVersions',
+    'EventBroadcaster',
+    'FastJSONResponse',
+    'read_import_rows',
+    'LatencyHistogram',
+    'RequestMetrics',
+    'RequestMetricsMiddleware',
+    'PrometheusText',
+    'NDJSON_MEDIA_TYPE',
+    'wants_ndjson',
+    'ndjson_stream',
+    'IdempotencyMiddleware',
+    'IdempotencyStats',
+    'create_idempotency_store',
+    'VolunteerTokenVerifier'
 ]
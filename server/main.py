@@ -2,10 +2,25 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from starlette.middleware.sessions import SessionMiddleware
 from contextlib import asynccontextmanager
+import asyncio
 
-from config.config import SESSION_SECRET_KEY, FRONTEND_URL
+from config.config import (
+    SESSION_SECRET_KEY, FRONTEND_URL, LEADERBOARD_RESYNC_SECONDS,
+    LEADERBOARD_STREAM_MAX_CLIENTS, LEADERBOARD_STREAM_QUEUE_SIZE,
+    IDEMPOTENCY_STORE, IDEMPOTENCY_TTL_SECONDS, IDEMPOTENCY_MAX_ENTRIES,
+    SECRET_KEY, VOLUNTEER_TOKEN_CACHE_SIZE
+)
 from database.DB import Database
-from routes import AuthRouter, EventRouter, VolunteerRouter, AttendanceRouter, TeamRouter
+from database.EventCache import EventCache
+from database.Leaderboard import Leaderboard
+from database.CounterBuffer import CounterBuffer
+from helpers.ResourceVersions import ResourceVersions
+from helpers.EventBroadcaster import EventBroadcaster
+from helpers.FastJSONResponse import FastJSONResponse
+from helpers.RequestMetrics import RequestMetrics, RequestMetricsMiddleware
+from helpers.Idempotency import IdempotencyMiddleware, IdempotencyStats, create_idempotency_store
+from helpers.VolunteerTokenVerifier import VolunteerTokenVerifier
+from routes import AuthRouter, EventRouter, VolunteerRouter, AttendanceRouter, TeamRouter, MetricsRouter
 
 ''' The backend API Endpoints setup '''
 
@@ -17,13 +32,63 @@ async def lifespan(app: FastAPI):
     db.connect()
     app.state.db = db
     print("Database connected successfully")
+
+    # Make sure every hot lookup is backed by an index
+    await db.ensure_indexes()
+    if not db.index_enforced("teams.member_email_unique"):
+        print("ERROR: teams.member_email_unique is not in place; users are kept to one team by "
+              "an extra membership read on every join until it is built")
+
+    app.state.event_cache = EventCache()
+    app.state.token_verifier = VolunteerTokenVerifier(SECRET_KEY, max_entries=VOLUNTEER_TOKEN_CACHE_SIZE)
+    versions = ResourceVersions()
+    app.state.versions = versions
+
+    broadcaster = EventBroadcaster(max_clients=LEADERBOARD_STREAM_MAX_CLIENTS, queue_size=LEADERBOARD_STREAM_QUEUE_SIZE)
+    app.state.broadcaster = broadcaster
+    # Open event streams would otherwise keep the server from ever reaching the shutdown below
+    restore_signal_handlers = broadcaster.close_on_signals()
+
+    # Scans buffer participant increments; readers see them once they are written
+    participant_counter = CounterBuffer("events", "event_id", "participants")
+    participant_counter.start(db)
+    app.state.participant_counter = participant_counter
+
+    app.state.idempotency_store = create_idempotency_store(
+        IDEMPOTENCY_STORE, db, ttl_seconds=IDEMPOTENCY_TTL_SECONDS, max_entries=IDEMPOTENCY_MAX_ENTRIES
+    )
+
+    def on_leaderboard_change(diff):
+        versions.bump("leaderboard")
+        if len(broadcaster):
+            if diff is None:
+                broadcaster.publish("snapshot", {"teams": leaderboard.all()})
+            else:
+                broadcaster.publish("score", diff)
+
+    # Materialize the leaderboard; if the database is unreachable it is loaded on first use
+    leaderboard = Leaderboard(on_change=on_leaderboard_change)
+    try:
+        await leaderboard.load(db)
+        print(f"Leaderboard loaded with {len(leaderboard)} teams")
+    except Exception as e:
+        print(f"Leaderboard load deferred: {e}")
+    app.state.leaderboard = leaderboard
+    resync_task = None
+    if LEADERBOARD_RESYNC_SECONDS > 0:
+        resync_task = asyncio.create_task(leaderboard.resync_forever(db))
     
     yield
     
     # Shutdown: Clean up resources if needed
+    if resync_task:
+        resync_task.cancel()
+    await participant_counter.close(db)
+    broadcaster.close()
+    restore_signal_handlers()
     print("Application shutting down")
 
-app = FastAPI(lifespan=lifespan)
+app = FastAPI(lifespan=lifespan, default_response_class=FastJSONResponse)
 
 print(f"Configuring CORS middleware...")
 print(f"FRONTEND_URL from config = {FRONTEND_URL}")
@@ -44,6 +109,15 @@ app.add_middleware(
     max_age=3600,
 )
 
+# Added before SessionMiddleware so it runs inside it: keys are scoped by the session user
+idempotency_stats = IdempotencyStats()
+app.state.idempotency_stats = idempotency_stats
+app.add_middleware(
+    IdempotencyMiddleware,
+    paths={"/api/volunteer/scan", "/api/volunteer/scan/batch", "/api/create_team", "/api/join_team_by_code"},
+    stats=idempotency_stats
+)
+
 if not SESSION_SECRET_KEY:
     raise ValueError("SESSION_SECRET_KEY environment variable not set!")
 
@@ -56,9 +130,15 @@ app.add_middleware(
     https_only=True
 )
 
+# Outermost middleware, so request latency includes session and CORS handling
+request_metrics = RequestMetrics()
+app.state.request_metrics = request_metrics
+app.add_middleware(RequestMetricsMiddleware, metrics=request_metrics)
+
 # Include routers
 app.include_router(AuthRouter.router, prefix="/api", tags=["Authentication"])
 app.include_router(EventRouter.router, prefix="/api/events", tags=["Events"])
 app.include_router(VolunteerRouter.router, prefix="/api/volunteer", tags=["Volunteers"])
 app.include_router(AttendanceRouter.router, prefix="/api/volunteer", tags=["Attendance"])
 app.include_router(TeamRouter.router, prefix="/api", tags=["Teams"])
+app.include_router(MetricsRouter.router, prefix="/api", tags=["Metrics"])
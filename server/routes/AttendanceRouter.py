@@ -1,27 +1,31 @@
 from fastapi import APIRouter, Request, HTTPException, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from pydantic import BaseModel
-from jose import jwt, JWTError
-from datetime import datetime, timedelta
+from pymongo import UpdateOne
+from typing import List, Optional
+from datetime import datetime, timezone
+import uuid
 
-from config.config import SECRET_KEY
 from database.DB import get_db
-from .dependencies import get_current_user, require_admin_or_volunteer
+from database.EventCache import get_event_cache
+from database.Leaderboard import get_leaderboard
+from database.CounterBuffer import get_participant_counter
+from .dependencies import get_current_user, require_admin_or_volunteer, get_token_verifier
 
 router = APIRouter()
 
 security = HTTPBearer()
 
-ALGORITHM = "HS256"
-TOKEN_EXPIRE_MINUTES = 180
+MAX_BATCH_SCANS = 200
 
 
-def verify_volunteer_token(token: str):
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        return payload
-    except JWTError:
-        return None
+def _scan_time(scan):
+    """Sort key for queued scans: naive UTC client timestamp, missing timestamps last"""
+    if scan.scanned_at is None:
+        return datetime.max
+    if scan.scanned_at.tzinfo is not None:
+        return scan.scanned_at.astimezone(timezone.utc).replace(tzinfo=None)
+    return scan.scanned_at
 
 
 # Pydantic models
@@ -29,12 +33,25 @@ class QRScanRequest(BaseModel):
     team_id: str
 
 
+class QueuedScan(BaseModel):
+    team_id: str
+    scanned_at: Optional[datetime] = None
+
+
+class BatchScanRequest(BaseModel):
+    scans: List[QueuedScan]
+
+
 @router.post("/scan")
 async def scan_qr(
     request: Request,
     credentials: HTTPAuthorizationCredentials = Depends(security),
     user=Depends(require_admin_or_volunteer),
-    db = Depends(get_db)
+    db = Depends(get_db),
+    event_cache = Depends(get_event_cache),
+    leaderboard = Depends(get_leaderboard),
+    participant_counter = Depends(get_participant_counter),
+    token_verifier = Depends(get_token_verifier)
 ):
     """
     Scans team QR (containing team_id). JWT in header proves event authorization.
@@ -54,7 +71,7 @@ async def scan_qr(
         raise HTTPException(status_code=422, detail=f"Invalid request format: {str(e)}")
     
     token = credentials.credentials
-    payload = verify_volunteer_token(token)
+    payload = token_verifier.verify(token)
 
     if not payload:
         raise HTTPException(status_code=401, detail="Invalid or expired event token")
@@ -62,29 +79,161 @@ async def scan_qr(
     event_id = payload["event_id"]
     volunteer_email = payload["sub"]
 
-    event = await db.find_one("events", {"event_id": event_id})
+    event = await event_cache.get(db, event_id)
     if not event:
         raise HTTPException(status_code=404, detail="Event not found")
 
-    team = await db.find_one("teams", {"qr_id": team_id})
-    if not team:
-        raise HTTPException(status_code=404, detail="Team not found")
+    if not token_verifier.accepts(payload, event):
+        raise HTTPException(status_code=401, detail="Invalid or expired event token")
 
     if event.get("expired"):
         raise HTTPException(status_code=400, detail="Event expired")
 
-    if event_id in team.get("events_participated", []):
-        raise HTTPException(status_code=400, detail="Team already participated in this event")
+    points = event.get("points", 0)
 
-    new_points = team.get("points", 0) + event.get("points", 0)
+    # Award in a single conditional update so that concurrent scans of the
+    # same team can never award the event twice
+    team = await db.find_one_and_update(
+        "teams",
+        {"qr_id": team_id, "events_participated": {"$ne": event_id}},
+        {"$inc": {"points": points}, "$push": {"events_participated": event_id}},
+        projection={"team_name": 1, "points": 1}
+    )
 
-    await db.update("teams", {"qr_id": team_id}, {"$set": {"points": new_points}, "$push": {"events_participated": event_id}})
+    if not team:
+        if await db.exists("teams", {"qr_id": team_id}):
+            raise HTTPException(status_code=400, detail="Team already participated in this event")
+        raise HTTPException(status_code=404, detail="Team not found")
 
-    await db.update("events", {"event_id": event_id}, {"$inc": {"participants": 1}})
+    participant_counter.add(event_id)
+    leaderboard.upsert(team["_id"], team["team_name"], team["points"])
 
     return {
         "message": f"✅ Team '{team['team_name']}' successfully scanned for event '{event['event_name']}'",
         "volunteer": volunteer_email,
-        "points_awarded": event["points"],
-        "team_points": new_points
+        "points_awarded": points,
+        "team_points": team["points"]
+    }
+
+
+@router.post("/scan/batch")
+async def scan_qr_batch(
+    batch: BatchScanRequest,
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    user=Depends(require_admin_or_volunteer),
+    db = Depends(get_db),
+    event_cache = Depends(get_event_cache),
+    leaderboard = Depends(get_leaderboard),
+    participant_counter = Depends(get_participant_counter),
+    token_verifier = Depends(get_token_verifier)
+):
+    """
+    Uploads scans queued on a volunteer device under one event JWT.
+    All awards are applied with a single bulk_write and a result is returned per scan
+    (awarded, duplicate or unknown_team).
+    """
+    if not batch.scans:
+        raise HTTPException(status_code=422, detail="No scans in request")
+    if len(batch.scans) > MAX_BATCH_SCANS:
+        raise HTTPException(status_code=413, detail=f"At most {MAX_BATCH_SCANS} scans per batch")
+
+    payload = token_verifier.verify(credentials.credentials)
+    if not payload:
+        raise HTTPException(status_code=401, detail="Invalid or expired event token")
+
+    event_id = payload["event_id"]
+    volunteer_email = payload["sub"]
+
+    event = await event_cache.get(db, event_id)
+    if not event:
+        raise HTTPException(status_code=404, detail="Event not found")
+
+    if not token_verifier.accepts(payload, event):
+        raise HTTPException(status_code=401, detail="Invalid or expired event token")
+
+    if event.get("expired"):
+        raise HTTPException(status_code=400, detail="Event expired")
+
+    points = event.get("points", 0)
+    qr_ids = list({scan.team_id for scan in batch.scans})
+
+    # One read tells which teams exist and which already have this event
+    result = await db.find_many(
+        "teams",
+        {"qr_id": {"$in": qr_ids}},
+        projection={"qr_id": 1, "team_name": 1, "events_participated": {"$elemMatch": {"$eq": event_id}}},
+        cache=False
+    )
+    teams = {team["qr_id"]: team for team in result["data"]}
+
+    # Earliest scan of a team wins; scans without a client timestamp go last
+    order = sorted(range(len(batch.scans)), key=lambda i: (_scan_time(batch.scans[i]), i))
+
+    statuses = [None] * len(batch.scans)
+    candidates = {}
+    for i in order:
+        qr_id = batch.scans[i].team_id
+        team = teams.get(qr_id)
+        if not team:
+            statuses[i] = "unknown_team"
+        elif team.get("events_participated") or qr_id in candidates:
+            statuses[i] = "duplicate"
+        else:
+            candidates[qr_id] = i
+
+    awarded = 0
+    if candidates:
+        # Each award also records this batch's receipt, so that if a concurrent scan
+        # wins a race the teams this batch awarded can still be told apart. It is a
+        # top-level field because unsetting a nested key would leave an empty object
+        receipt = str(uuid.uuid4())
+        receipt_field = f"award_receipt_{event_id}"
+        operations = [
+            UpdateOne(
+                {"qr_id": qr_id, "events_participated": {"$ne": event_id}},
+                {"$inc": {"points": points}, "$push": {"events_participated": event_id}, "$set": {receipt_field: receipt}}
+            )
+            for qr_id in candidates
+        ]
+        receipt_query = {"qr_id": {"$in": list(candidates)}, receipt_field: receipt}
+        try:
+            write_result = await db.bulk_write("teams", operations)
+            awarded = write_result["modified_count"]
+
+            if awarded == len(candidates):
+                awarded_ids = set(candidates)
+            else:
+                # bulk_write only reports totals; read back which candidates carry our receipt
+                result = await db.find_many("teams", receipt_query, projection={"qr_id": 1}, cache=False)
+                awarded_ids = {team["qr_id"] for team in result["data"]}
+        finally:
+            # Receipts are only needed until they are read back, and must not reach team responses
+            await db.update_many("teams", receipt_query, {"$unset": {receipt_field: ""}})
+
+        for qr_id, i in candidates.items():
+            if qr_id in awarded_ids:
+                statuses[i] = "awarded"
+                leaderboard.add_points(teams[qr_id]["_id"], teams[qr_id]["team_name"], points)
+            else:
+                statuses[i] = "duplicate"
+
+        participant_counter.add(event_id, awarded)
+
+    results = []
+    for scan, status in zip(batch.scans, statuses):
+        team = teams.get(scan.team_id)
+        results.append({
+            "team_id": scan.team_id,
+            "team_name": team.get("team_name") if team else None,
+            "scanned_at": scan.scanned_at,
+            "status": status,
+            "points_awarded": points if status == "awarded" else 0
+        })
+
+    return {
+        "message": f"Processed {len(results)} scans for event '{event['event_name']}'",
+        "volunteer": volunteer_email,
+        "event_id": event_id,
+        "awarded": awarded,
+        "results": results
     }
@@ -1,10 +1,11 @@
 from fastapi import APIRouter, Request, HTTPException, Depends
-from fastapi.responses import RedirectResponse, JSONResponse
+from fastapi.responses import RedirectResponse
 from authlib.integrations.starlette_client import OAuth
 from datetime import datetime
 import httpx
 
 from config.config import CLIENT_ID, CLIENT_SECRET, ADMIN_EMAIL, FRONTEND_URL
+from helpers.FastJSONResponse import FastJSONResponse
 from database.DB import get_db
 from .dependencies import get_current_user, require_admin, require_admin_or_volunteer
 
@@ -38,7 +39,7 @@ async def auth(request: Request, db = Depends(get_db)):
 
         code = request.query_params.get('code')
         if not code:
-            return JSONResponse(status_code=400, content={"error": "No authorization code received"})
+            return FastJSONResponse(status_code=400, content={"error": "No authorization code received"})
 
         token_url = "https://login.microsoftonline.com/organizations/oauth2/v2.0/token"
 
@@ -58,7 +59,7 @@ async def auth(request: Request, db = Depends(get_db)):
 
             if token_response.status_code != 200:
                 print(f"Token exchange failed: {token_response.text}")
-                return JSONResponse(status_code=401, content={
+                return FastJSONResponse(status_code=401, content={
                     "error": "Token exchange failed",
                     "details": token_response.text
                 })
@@ -67,7 +68,7 @@ async def auth(request: Request, db = Depends(get_db)):
             access_token = token_data.get('access_token')
 
             if not access_token:
-                return JSONResponse(status_code=401, content={
+                return FastJSONResponse(status_code=401, content={
                     "error": "No access token received",
                     "details": str(token_data)
                 })
@@ -78,7 +79,7 @@ async def auth(request: Request, db = Depends(get_db)):
             )
 
             if user_response.status_code != 200:
-                return JSONResponse(status_code=401, content={
+                return FastJSONResponse(status_code=401, content={
                     "error": "Failed to get user info",
                     "details": user_response.text
                 })
@@ -88,7 +89,7 @@ async def auth(request: Request, db = Depends(get_db)):
         email = user_data.get("mail") or user_data.get("userPrincipalName")
 
         if not email or not email.endswith('@iiitb.ac.in'):
-            return JSONResponse(
+            return FastJSONResponse(
                 status_code=403,
                 content={"error": "Access Denied: Only users with an 'iiitb.ac.in' email can log in."}
             )
@@ -101,8 +102,7 @@ async def auth(request: Request, db = Depends(get_db)):
             role = "admin"
         else:
             try:
-                is_volunteer = await db.find_one("volunteers", {"email": email.lower()})
-                if is_volunteer:
+                if await db.exists("volunteers", {"email": email.lower()}):
                     role = "volunteer"
             except Exception as db_e:
                 print(f"Database error when checking volunteer status: {db_e}")
@@ -125,7 +125,7 @@ async def auth(request: Request, db = Depends(get_db)):
         print(f"OAuth error details: {e}")
         import traceback
         traceback.print_exc()
-        return JSONResponse(status_code=401, content={
+        return FastJSONResponse(status_code=401, content={
             "error": "Authorization failed",
             "details": str(e),
             "error_type": type(e).__name__
@@ -135,7 +135,7 @@ async def auth(request: Request, db = Depends(get_db)):
 @router.get('/health')
 async def health_check():
     """Simple health check endpoint"""
-    return JSONResponse(content={"status": "healthy", "message": "Server is running"})
+    return FastJSONResponse(content={"status": "healthy", "message": "Server is running"})
 
 
 @router.get('/debug/session')
@@ -171,7 +171,7 @@ async def debug_session(request: Request):
         print(f"\nError reading session: {str(e)}")
         session_data = {"error": f"Unable to read session: {str(e)}"}
 
-    response = JSONResponse(content={
+    response = FastJSONResponse(content={
         "timestamp": datetime.utcnow().isoformat(),
         "request": {
             "origin": origin,
@@ -202,8 +202,8 @@ async def debug_session(request: Request):
 async def user_profile(request: Request):
     user = request.session.get('user')
     if user:
-        return JSONResponse(content=user)
-    return JSONResponse(status_code=401, content={"error": "User not authenticated"})
+        return FastJSONResponse(content=user)
+    return FastJSONResponse(status_code=401, content={"error": "User not authenticated"})
 
 
 @router.get('/logout')
@@ -1,14 +1,20 @@
 from fastapi import APIRouter, Request, HTTPException, Depends, Query
-from fastapi.responses import JSONResponse
+from fastapi.responses import StreamingResponse
 from typing import Optional
-from pydantic import BaseModel
+from pydantic import BaseModel, ValidationError
 from datetime import datetime
+import time
 import uuid
 
 from helpers.SecretCodeEncryptionStrategy import SecretCodeEncryptionStrategy
+from helpers.NDJSONStream import NDJSON_MEDIA_TYPE, wants_ndjson, ndjson_stream
+from helpers.FastJSONResponse import FastJSONResponse
+from helpers.ResourceVersions import ResourceVersions
+from helpers.BulkImport import read_import_rows, validation_error, count_statuses
 from config.config import SECRET_KEY
 from database.DB import get_db
-from .dependencies import get_current_user, require_admin
+from database.EventCache import get_event_cache
+from .dependencies import get_current_user, require_admin, not_modified, list_read
 
 router = APIRouter()
 
@@ -64,7 +70,7 @@ async def create_event(request: Request, event_data: EventCreate, admin_user: di
         if result["status"] == 200:
             event = result["data"]
             event["secret_code"] = encrypt_secret_code(event.get("secret_code", ""))
-            return JSONResponse(content={"message": "Event created successfully", "event": event})
+            return FastJSONResponse(content={"message": "Event created successfully", "event": event})
         else:
             raise HTTPException(status_code=500, detail="Failed to create event")
 
@@ -72,6 +78,71 @@ async def create_event(request: Request, event_data: EventCreate, admin_user: di
         raise HTTPException(status_code=500, detail=f"Error creating event: {str(e)}")
 
 
+@router.post('/bulk')
+async def bulk_create_events(request: Request, admin_user: dict = Depends(require_admin), db = Depends(get_db)):
+    """
+    Create many events from a CSV (event_name,points,secret_code) or JSON body (Admin only).
+    Secret codes are encrypted the same way as for a single create; every row gets an outcome.
+    """
+    try:
+        rows = await read_import_rows(request)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+    try:
+        results = [None] * len(rows)
+        events = []
+        positions = []
+        # Events have no natural key other than their name, so re-importing a file
+        # reports the events it already created instead of creating them again
+        names = [row.get("event_name") for row in rows if isinstance(row.get("event_name"), str)]
+        existing = await db.find_many("events", {"event_name": {"$in": names}}, projection={"event_name": 1}, cache=False)
+        existing_names = {event["event_name"] for event in existing["data"]}
+        seen_names = set()
+        for index, row in enumerate(rows):
+            try:
+                event_data = EventCreate(**row)
+            except ValidationError as e:
+                results[index] = {"row": index + 1, "status": "invalid", "error": validation_error(e)}
+                continue
+
+            if event_data.event_name in seen_names:
+                results[index] = {"row": index + 1, "status": "invalid", "error": "Event appears more than once in the import"}
+                continue
+            seen_names.add(event_data.event_name)
+            if event_data.event_name in existing_names:
+                results[index] = {"row": index + 1, "event_name": event_data.event_name, "status": "existing"}
+                continue
+
+            decrypted_secret = decrypt_secret_code(event_data.secret_code)
+            if not decrypted_secret:
+                results[index] = {"row": index + 1, "status": "invalid", "error": "Unable to decrypt secret code"}
+                continue
+
+            events.append({
+                "event_id": str(uuid.uuid4()),
+                "event_name": event_data.event_name,
+                "points": event_data.points,
+                "secret_code": decrypted_secret,
+                "expired": False,
+                "participants": 0,
+                "created_at": datetime.utcnow(),
+                "created_by": admin_user["email"]
+            })
+            positions.append(index)
+
+        if events:
+            result = await db.bulk_add("events", events)
+            for index, event, outcome in zip(positions, events, result["results"]):
+                outcome.pop("index")
+                results[index] = {"row": index + 1, "event_id": event["event_id"], "event_name": event["event_name"], **outcome}
+
+        return FastJSONResponse(content={"message": f"Processed {len(rows)} events", "counts": count_statuses(results), "results": results})
+
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error importing events: {str(e)}")
+
+
 @router.get('')
 async def get_events(request: Request, user: dict = Depends(get_current_user), ids: Optional[str] = Query(None), db = Depends(get_db)):
     """Get all events or specific events by IDs"""
@@ -89,22 +160,41 @@ async def get_events(request: Request, user: dict = Depends(get_current_user), i
             ).to_list(None)
             return events
         
-        # Get all events
-        result = await db.find_many("events")
+        read = list_read(user)
+        # Every events write bumps the shared version (see database/DB.py VERSIONED_COLLECTIONS),
+        # so an unchanged list is answered with 304 before it is read
+        etag = ResourceVersions.shared_etag("events", await db.version("events", read=read["read"]))
+        cached = not_modified(request, etag)
+        if cached:
+            return cached
+
+        # Get all events, streamed one per line if the client asked for NDJSON
+        if wants_ndjson(request):
+            def encrypt_event(event):
+                event["secret_code"] = encrypt_secret_code(event.get("secret_code", ""))
+                return event
+
+            return StreamingResponse(
+                ndjson_stream(db.iter_many("events", read=read["read"]), transform=encrypt_event),
+                media_type=NDJSON_MEDIA_TYPE,
+                headers={"ETag": etag}
+            )
+
+        result = await db.find_many("events", **read)
         if result["status"] == 200:
             events = result["data"]
             for event in events:
                 event["secret_code"] = encrypt_secret_code(event.get("secret_code", ""))
-            return JSONResponse(content={"events": events})
+            return FastJSONResponse(content={"events": events}, headers={"ETag": etag})
         else:
-            return JSONResponse(content={"events": []})
+            return FastJSONResponse(content={"events": []})
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching events: {str(e)}")
 
 
 @router.put('/{event_id}')
-async def update_event(event_id: str, event_data: EventUpdate, request: Request, admin_user: dict = Depends(require_admin), db = Depends(get_db)):
+async def update_event(event_id: str, event_data: EventUpdate, request: Request, admin_user: dict = Depends(require_admin), db = Depends(get_db), event_cache = Depends(get_event_cache)):
     """Update an existing event (Admin only)"""
     try:
         update_data = {}
@@ -127,8 +217,13 @@ async def update_event(event_id: str, event_data: EventUpdate, request: Request,
 
         update_data["updated_at"] = datetime.utcnow()
         update_data["updated_by"] = admin_user["email"]
+        # Expiring the event or rotating its secret code cuts off the scanning tokens already handed out;
+        # fractional seconds so a token issued right after the rotation stays valid
+        if update_data.get("expired") or "secret_code" in update_data:
+            update_data["tokens_valid_after"] = time.time()
 
         result = await db.update("events", {"event_id": event_id}, {"$set": update_data})
+        event_cache.invalidate(event_id)
 
         if result["matched_count"] == 0:
             raise HTTPException(status_code=404, detail="Event not found")
@@ -137,7 +232,7 @@ async def update_event(event_id: str, event_data: EventUpdate, request: Request,
         if updated_event:
             updated_event["secret_code"] = encrypt_secret_code(updated_event.get("secret_code", ""))
 
-        return JSONResponse(content={"message": "Event updated successfully", "event": updated_event})
+        return FastJSONResponse(content={"message": "Event updated successfully", "event": updated_event})
 
     except HTTPException:
         raise
@@ -146,14 +241,15 @@ async def update_event(event_id: str, event_data: EventUpdate, request: Request,
 
 
 @router.delete('/{event_id}')
-async def delete_event(event_id: str, request: Request, admin_user: dict = Depends(require_admin), db = Depends(get_db)):
+async def delete_event(event_id: str, request: Request, admin_user: dict = Depends(require_admin), db = Depends(get_db), event_cache = Depends(get_event_cache)):
     """Delete an event (Admin only)"""
     try:
         result = await db.delete("events", {"event_id": event_id})
+        event_cache.invalidate(event_id)
         if result["deleted_count"] == 0:
             raise HTTPException(status_code=404, detail="Event not found")
 
-        return JSONResponse(content={"message": "Event deleted successfully"})
+        return FastJSONResponse(content={"message": "Event deleted successfully"})
 
     except HTTPException:
         raise
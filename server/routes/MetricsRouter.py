@@ -0,0 +1,184 @@
+from fastapi import APIRouter, Request, HTTPException, Response
+import hmac
+import time
+
+from config.config import METRICS_TOKEN
+from helpers.PrometheusText import PrometheusText, PROMETHEUS_MEDIA_TYPE
+
+router = APIRouter()
+
+
+def _authorize_scrape(request: Request):
+    """
+    With METRICS_TOKEN set, scrapers must send it as a bearer token; otherwise
+    only a logged-in admin can read the metrics.
+    """
+    if METRICS_TOKEN:
+        scheme, _, token = request.headers.get("authorization", "").partition(" ")
+        if scheme.lower() != "bearer" or not hmac.compare_digest(token.encode(), METRICS_TOKEN.encode()):
+            raise HTTPException(status_code=401, detail="Invalid metrics token")
+        return
+
+    user = request.session.get("user")
+    if not user:
+        raise HTTPException(status_code=401, detail="User not authenticated")
+    if user.get("role") != "admin":
+        raise HTTPException(status_code=403, detail="Admin access required")
+
+
+def _add_http_metrics(text, request_metrics):
+    text.add("http_requests_total", "counter", "HTTP requests by method, route template and status")
+    for (method, route, status), count in sorted(request_metrics.responses().items()):
+        text.sample("http_requests_total", count, {"method": method, "route": route, "status": status})
+
+    text.add("http_requests_in_flight", "gauge", "HTTP requests currently being served")
+    text.sample("http_requests_in_flight", request_metrics.in_flight)
+    text.add("http_streams_open", "gauge", "Open Server-Sent Events responses")
+    text.sample("http_streams_open", request_metrics.streams_open)
+
+    histograms = sorted(request_metrics.histograms().items())
+    text.add("http_request_duration_seconds", "histogram", "HTTP request latency by route template")
+    for (method, route), histogram in histograms:
+        text.histogram("http_request_duration_seconds", histogram, {"method": method, "route": route})
+    text.add("http_request_duration_quantile_seconds", "gauge", "Estimated p50/p95/p99 HTTP latency by route template")
+    for (method, route), histogram in histograms:
+        text.quantiles("http_request_duration_quantile_seconds", histogram, {"method": method, "route": route})
+
+
+def _add_database_metrics(text, db):
+    operations = sorted(db.metrics.operations().items())
+    text.add("mongo_operation_duration_seconds", "histogram", "MongoDB round trip latency by collection and operation")
+    for (collection_name, operation), entry in operations:
+        text.histogram("mongo_operation_duration_seconds", entry["latency"], {"collection": collection_name, "operation": operation})
+    text.add("mongo_operation_duration_quantile_seconds", "gauge", "Estimated p50/p95/p99 MongoDB latency")
+    for (collection_name, operation), entry in operations:
+        text.quantiles("mongo_operation_duration_quantile_seconds", entry["latency"], {"collection": collection_name, "operation": operation})
+    for field, help_text in (("errors", "Failed MongoDB operations"),
+                             ("documents", "Documents returned or written"),
+                             ("bytes", "BSON bytes returned or written")):
+        name = f"mongo_operation_{field}_total"
+        text.add(name, "counter", help_text)
+        for (collection_name, operation), entry in operations:
+            text.sample(name, entry[field], {"collection": collection_name, "operation": operation})
+    text.add("mongo_slow_operations_total", "counter", "MongoDB operations slower than SLOW_QUERY_MS")
+    text.sample("mongo_slow_operations_total", db.metrics.slow_queries)
+
+    client_options = getattr(db.client, "options", None)
+    if client_options is not None:
+        pool_options = client_options.pool_options
+        text.add("mongo_pool_max_size", "gauge", "Configured maximum connections per server")
+        text.sample("mongo_pool_max_size", pool_options.max_pool_size)
+        text.add("mongo_pool_min_size", "gauge", "Configured minimum connections per server")
+        text.sample("mongo_pool_min_size", pool_options.min_pool_size)
+
+    pool = db.pool_monitor.stats()
+    for name, metric_type, field, help_text in (
+        ("mongo_pool_connections_open", "gauge", "connections_open", "Open pooled connections"),
+        ("mongo_pool_connections_in_use", "gauge", "connections_in_use", "Pooled connections checked out"),
+        ("mongo_pool_connections_created_total", "counter", "connections_created", "Connections opened by the pool"),
+        ("mongo_pool_checkouts_total", "counter", "checkouts", "Successful connection checkouts"),
+        ("mongo_pool_exhausted_total", "counter", "exhausted", "Checkouts that timed out waiting for a free connection"),
+        ("mongo_pool_clears_total", "counter", "pool_clears", "Times the pool was cleared after an error"),
+    ):
+        text.add(name, metric_type, help_text)
+        text.sample(name, pool[field])
+    text.add("mongo_pool_checkout_failures_total", "counter", "Failed connection checkouts by reason")
+    for reason, count in sorted(pool["checkout_failures"].items()):
+        text.sample("mongo_pool_checkout_failures_total", count, {"reason": reason})
+    checkout_wait = db.pool_monitor.checkout_wait()
+    text.add("mongo_pool_checkout_wait_seconds", "histogram", "Time spent waiting to check out a connection")
+    text.histogram("mongo_pool_checkout_wait_seconds", checkout_wait)
+    text.add("mongo_pool_checkout_wait_quantile_seconds", "gauge", "Estimated p50/p95/p99 connection checkout wait")
+    text.quantiles("mongo_pool_checkout_wait_quantile_seconds", checkout_wait)
+
+
+def _add_cache_metrics(text, caches):
+    families = (
+        ("cache_entries", "gauge", "size", "Entries currently cached"),
+        ("cache_hits_total", "counter", "hits", "Cache hits"),
+        ("cache_misses_total", "counter", "misses", "Cache misses"),
+        ("cache_evictions_total", "counter", "evictions", "Entries evicted by the size bound"),
+        ("cache_expirations_total", "counter", "expirations", "Entries dropped after their TTL"),
+    )
+    for name, metric_type, field, help_text in families:
+        text.add(name, metric_type, help_text)
+        for cache_name, stats in caches:
+            text.sample(name, stats[field], {"cache": cache_name})
+
+
+@router.get('/metrics')
+async def metrics(request: Request):
+    """Prometheus text exposition of request, database, cache and stream metrics"""
+    _authorize_scrape(request)
+    state = request.app.state
+    text = PrometheusText()
+
+    _add_http_metrics(text, state.request_metrics)
+
+    db = getattr(state, "db", None)
+    caches = []
+    if db is not None:
+        _add_database_metrics(text, db)
+        caches.extend((f"query_{collection_name}", stats) for collection_name, stats in sorted(db.cache_stats().items()))
+    event_cache = getattr(state, "event_cache", None)
+    if event_cache is not None:
+        caches.append(("events", event_cache.stats()))
+    token_verifier = getattr(state, "token_verifier", None)
+    if token_verifier is not None:
+        caches.append(("volunteer_tokens", token_verifier.stats()))
+    idempotency_store = getattr(state, "idempotency_store", None)
+    if idempotency_store is not None and idempotency_store.stats():
+        caches.append(("idempotency", idempotency_store.stats()))
+    _add_cache_metrics(text, caches)
+
+    leaderboard = getattr(state, "leaderboard", None)
+    if leaderboard is not None:
+        text.add("leaderboard_teams", "gauge", "Teams held by the in-memory leaderboard")
+        text.sample("leaderboard_teams", len(leaderboard))
+        text.add("leaderboard_age_seconds", "gauge", "Seconds since the leaderboard was last rebuilt from the database")
+        text.sample("leaderboard_age_seconds", round(time.time() - leaderboard.loaded_at, 3) if leaderboard.loaded else None)
+
+    broadcaster = getattr(state, "broadcaster", None)
+    if broadcaster is not None:
+        stats = broadcaster.stats()
+        text.add("leaderboard_stream_clients", "gauge", "Connected leaderboard stream clients")
+        text.sample("leaderboard_stream_clients", stats["clients"])
+        for field, help_text in (("published", "Leaderboard stream events published"),
+                                 ("dropped", "Queued stream messages dropped for lagging clients"),
+                                 ("rejected", "Stream connections rejected at the client cap")):
+            name = f"leaderboard_stream_{field}_total"
+            text.add(name, "counter", help_text)
+            text.sample(name, stats[field])
+
+    participant_counter = getattr(state, "participant_counter", None)
+    if participant_counter is not None:
+        stats = participant_counter.stats()
+        text.add("participant_counter_pending", "gauge", "Buffered participant increments not yet written")
+        text.sample("participant_counter_pending", stats["pending_increments"])
+        for field, help_text in (("flushes", "Participant counter flushes"),
+                                 ("flush_failures", "Participant counter flushes that left increments pending"),
+                                 ("increments_written", "Participant increments written to the database"),
+                                 ("updates_written", "Event updates issued by participant counter flushes")):
+            name = f"participant_counter_{field}_total"
+            text.add(name, "counter", help_text)
+            text.sample(name, stats[field])
+
+    if token_verifier is not None:
+        text.add("volunteer_token_rejections_total", "counter", "Volunteer event tokens rejected on scan")
+        text.sample("volunteer_token_rejections_total", token_verifier.rejected, {"reason": "invalid"})
+        text.sample("volunteer_token_rejections_total", token_verifier.revoked_rejections, {"reason": "revoked"})
+
+    idempotency_stats = getattr(state, "idempotency_stats", None)
+    if idempotency_stats is not None:
+        stats = idempotency_stats.stats()
+        text.add("idempotency_in_flight", "gauge", "Requests with an Idempotency-Key currently executing")
+        text.sample("idempotency_in_flight", stats["in_flight"])
+        for field, help_text in (("replays", "Stored responses replayed for a repeated Idempotency-Key"),
+                                 ("coalesced", "Repeated keys that waited for the original request to finish"),
+                                 ("mismatches", "Idempotency-Keys reused with a different request body"),
+                                 ("stored", "Responses stored under an Idempotency-Key")):
+            name = f"idempotency_{field}_total"
+            text.add(name, "counter", help_text)
+            text.sample(name, stats[field])
+
+    return Response(content=text.render(), media_type=PROMETHEUS_MEDIA_TYPE)
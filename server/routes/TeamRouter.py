@@ -1,17 +1,25 @@
-from fastapi import APIRouter, Request, HTTPException, Depends
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, Request, HTTPException, Depends, Query
+from fastapi.responses import StreamingResponse
 from typing import Optional
-from pydantic import BaseModel
+from pydantic import BaseModel, ValidationError
+from pymongo.errors import DuplicateKeyError
 from datetime import datetime
 import uuid
 
-from config.config import DEADLINE_DATE
+from config.config import DEADLINE_DATE, LEADERBOARD_STREAM_HEARTBEAT_SECONDS
 from helpers.QRCodeGenerator import generate_team_qr_id, generate_team_join_code
+from helpers.NDJSONStream import NDJSON_MEDIA_TYPE, wants_ndjson, ndjson_stream
+from helpers.FastJSONResponse import FastJSONResponse
+from helpers.BulkImport import read_import_rows, validation_error, count_statuses
 from database.DB import get_db
-from .dependencies import get_current_user
+from database.Leaderboard import get_leaderboard
+from .dependencies import get_current_user, require_admin, get_versions, get_broadcaster, not_modified
 
 router = APIRouter()
 
+DEFAULT_LEADERBOARD_PAGE = 50
+MAX_LEADERBOARD_PAGE = 500
+
 
 # Pydantic models
 class TeamCreate(BaseModel):
@@ -22,8 +30,15 @@ class TeamAction(BaseModel):
     team_id: str
 
 
+class TeamImportRow(BaseModel):
+    team_name: str
+    name: str
+    email: str
+    rollNumber: str = "N/A"
+
+
 @router.post('/create_team')
-async def create_team(payload: TeamCreate, request: Request, user: dict = Depends(get_current_user), db = Depends(get_db)):
+async def create_team(payload: TeamCreate, request: Request, user: dict = Depends(get_current_user), db = Depends(get_db), leaderboard = Depends(get_leaderboard)):
     """Create a new team with the requesting user as the only member."""
     if db is None:
         raise HTTPException(status_code=503, detail="Database connection not available. Please check MongoDB configuration.")
@@ -39,19 +54,17 @@ async def create_team(payload: TeamCreate, request: Request, user: dict = Depend
                     deadline_dt = None
 
             if deadline_dt and datetime.utcnow() > deadline_dt:
-                return JSONResponse(status_code=400, content={"success": False, "message": "Cannot create team after the deadline."})
+                return FastJSONResponse(status_code=400, content={"success": False, "message": "Cannot create team after the deadline."})
 
         team_name = payload.team_name
         if team_name:
-            existing_name = await db.find_one("teams", {"team_name": team_name})
-            if existing_name:
-                return JSONResponse(status_code=400, content={"success": False, "message": "Team name already taken. Choose a different name."})
+            if await db.exists("teams", {"team_name": team_name}):
+                return FastJSONResponse(status_code=400, content={"success": False, "message": "Team name already taken. Choose a different name."})
 
         email = user.get("email")
         if email:
-            already_in = await db.find_one("teams", {"members.email": email})
-            if already_in:
-                return JSONResponse(status_code=400, content={"success": False, "message": "User already belongs to a team and cannot create another."})
+            if await db.exists("teams", {"members.email": email}):
+                return FastJSONResponse(status_code=400, content={"success": False, "message": "User already belongs to a team and cannot create another."})
 
         team_id = str(uuid.uuid4())
         team_name = team_name or f"Team-{team_id[:8]}"
@@ -78,9 +91,15 @@ async def create_team(payload: TeamCreate, request: Request, user: dict = Depend
             "created_by": user.get("email")
         }
 
-        result = await db.add("teams", team)
+        try:
+            result = await db.add("teams", team)
+        except DuplicateKeyError:
+            # Lost a race against a concurrent create/join; the unique indexes decided
+            return FastJSONResponse(status_code=400, content={"success": False, "message": "Team name already taken or user already belongs to a team."})
+
         if result["status"] == 200:
-            return JSONResponse(status_code=201, content={"message": "Team created successfully", "team": result["data"]})
+            leaderboard.upsert(result["data"]["_id"], team_name, 0)
+            return FastJSONResponse(status_code=201, content={"message": "Team created successfully", "team": result["data"]})
         else:
             raise HTTPException(status_code=500, detail="Failed to create team")
 
@@ -88,6 +107,107 @@ async def create_team(payload: TeamCreate, request: Request, user: dict = Depend
         raise HTTPException(status_code=500, detail=f"Error creating team: {str(e)}")
 
 
+@router.post('/teams/bulk')
+async def bulk_import_teams(request: Request, admin_user: dict = Depends(require_admin), db = Depends(get_db), leaderboard = Depends(get_leaderboard)):
+    """
+    Pre-seed teams from a CSV (team_name,name,email,rollNumber) or JSON body with one row
+    per member (Admin only). Teams are created or extended by name, at most 3 members each;
+    every row gets an outcome.
+    """
+    try:
+        rows = await read_import_rows(request)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+    try:
+        results = [None] * len(rows)
+        teams = {}
+        seen_emails = set()
+        for index, row in enumerate(rows):
+            try:
+                member_row = TeamImportRow(**row)
+            except ValidationError as e:
+                results[index] = {"row": index + 1, "status": "invalid", "error": validation_error(e)}
+                continue
+
+            team = teams.setdefault(member_row.team_name, {"members": [], "rows": []})
+            if member_row.email in seen_emails:
+                results[index] = {"row": index + 1, "status": "invalid", "error": "Member appears more than once in the import"}
+            elif len(team["members"]) >= 3:
+                results[index] = {"row": index + 1, "status": "invalid", "error": "Team is full (maximum 3 members)"}
+            else:
+                seen_emails.add(member_row.email)
+                team["members"].append({
+                    "name": member_row.name,
+                    "email": member_row.email,
+                    "rollNumber": member_row.rollNumber,
+                    "role": "participant"
+                })
+                team["rows"].append(index)
+
+        # Members already on their team are reported instead of being added a second time
+        existing = await db.find_many(
+            "teams", {"team_name": {"$in": list(teams)}},
+            projection={"team_name": 1, "members.email": 1}, cache=False
+        )
+        current_members = {
+            team["team_name"]: {member.get("email") for member in team.get("members", [])}
+            for team in existing["data"]
+        }
+        for team_name, team in teams.items():
+            kept = []
+            for member, index in zip(team["members"], team["rows"]):
+                if member["email"] in current_members.get(team_name, ()):
+                    results[index] = {"row": index + 1, "team_name": team_name, "status": "existing"}
+                else:
+                    kept.append((member, index))
+            team["members"] = [member for member, _ in kept]
+            team["rows"] = [index for _, index in kept]
+
+        teams = {team_name: team for team_name, team in teams.items() if team["members"]}
+        updates = []
+        now = datetime.utcnow()
+        for team_name, team in teams.items():
+            team_id = str(uuid.uuid4())
+            updates.append((
+                # Only match teams with room left that gained none of these members meanwhile;
+                # otherwise the upsert collides on team_name and the rows are reported as failed
+                {
+                    "team_name": team_name,
+                    f"members.{3 - len(team['members'])}": {"$exists": False},
+                    "members.email": {"$nin": [member["email"] for member in team["members"]]}
+                },
+                {
+                    "$setOnInsert": {
+                        "team_id": team_id,
+                        "qr_id": generate_team_qr_id(team_id),
+                        "join_code": generate_team_join_code(team_id, team_name),
+                        "points": 0,
+                        "events_participated": [],
+                        "created_at": now,
+                        "created_by": admin_user["email"]
+                    },
+                    "$push": {"members": {"$each": team["members"]}}
+                }
+            ))
+
+        if updates:
+            result = await db.bulk_update("teams", updates, upsert=True)
+            for (team_name, team), outcome in zip(teams.items(), result["results"]):
+                outcome.pop("index")
+                if outcome["status"] == "inserted":
+                    leaderboard.upsert(outcome["_id"], team_name, 0)
+                elif outcome["status"] == "failed":
+                    outcome["error"] = "Team is full or a member already belongs to another team"
+                for index in team["rows"]:
+                    results[index] = {"row": index + 1, "team_name": team_name, **outcome}
+
+        return FastJSONResponse(content={"message": f"Processed {len(rows)} member rows", "counts": count_statuses(results), "results": results})
+
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error importing teams: {str(e)}")
+
+
 @router.get('/my_team')
 async def get_my_team(request: Request, user: dict = Depends(get_current_user), db = Depends(get_db)):
     """Get the team that the current user belongs to"""
@@ -97,33 +217,58 @@ async def get_my_team(request: Request, user: dict = Depends(get_current_user),
     try:
         email = user.get("email")
         if not email:
-            return JSONResponse(status_code=400, content={"error": "User email not found"})
+            return FastJSONResponse(status_code=400, content={"error": "User email not found"})
 
         team = await db.find_one("teams", {"members.email": email})
         if not team:
-            return JSONResponse(content={"team": None, "message": "User not in any team"})
+            return FastJSONResponse(content={"team": None, "message": "User not in any team"})
 
+        # Teams that predate stored codes get them persisted on first view, since
+        # joins and scans only ever look the stored codes up
+        missing_codes = {}
         if not team.get("qr_id"):
-            team["qr_id"] = generate_team_qr_id(team["team_id"])
+            missing_codes["qr_id"] = generate_team_qr_id(team["team_id"])
         if not team.get("join_code"):
-            team["join_code"] = generate_team_join_code(team["team_id"], team["team_name"])
+            missing_codes["join_code"] = generate_team_join_code(team["team_id"], team["team_name"])
 
-        if not team.get("qr_id") or not team.get("join_code"):
-            await db.update(
-                "teams",
-                {"team_id": team["team_id"]},
-                {"$set": {
-                    "qr_id": team["qr_id"],
-                    "join_code": team["join_code"]
-                }}
-            )
+        if missing_codes:
+            await db.update("teams", {"team_id": team["team_id"]}, {"$set": missing_codes})
+            team.update(missing_codes)
 
-        return JSONResponse(content={"team": team})
+        return FastJSONResponse(content={"team": team})
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching team: {str(e)}")
 
 
+@router.get('/my_team/rank')
+async def get_my_team_rank(request: Request, user: dict = Depends(get_current_user), db = Depends(get_db), leaderboard = Depends(get_leaderboard)):
+    """Get the rank of the current user's team and the gap to the teams just above and below"""
+    if db is None:
+        raise HTTPException(status_code=503, detail="Database connection not available")
+
+    try:
+        email = user.get("email")
+        if not email:
+            return FastJSONResponse(status_code=400, content={"error": "User email not found"})
+
+        team = await db.find_one("teams", {"members.email": email}, projection={"team_id": 1, "team_name": 1, "points": 1})
+        if not team:
+            return FastJSONResponse(content={"rank": None, "message": "User not in any team"})
+
+        await leaderboard.ensure_loaded(db)
+        rank = leaderboard.rank(team["_id"])
+        if rank is None:
+            # Team created by another worker since the last resync
+            leaderboard.upsert(team["_id"], team["team_name"], team.get("points", 0))
+            rank = leaderboard.rank(team["_id"])
+
+        return FastJSONResponse(content={"team_id": team["team_id"], "team_name": team["team_name"], **rank})
+
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching team rank: {str(e)}")
+
+
 @router.post('/join_team_by_code')
 async def join_team_by_code(request: Request, user: dict = Depends(get_current_user), db = Depends(get_db)):
     """Join a team using a join code"""
@@ -135,7 +280,7 @@ async def join_team_by_code(request: Request, user: dict = Depends(get_current_u
         join_code = body.get("join_code")
 
         if not join_code:
-            return JSONResponse(status_code=400, content={"success": False, "message": "Join code is required"})
+            return FastJSONResponse(status_code=400, content={"success": False, "message": "Join code is required"})
 
         if DEADLINE_DATE:
             try:
@@ -147,63 +292,43 @@ async def join_team_by_code(request: Request, user: dict = Depends(get_current_u
                     deadline_dt = None
 
             if deadline_dt and datetime.utcnow() > deadline_dt:
-                return JSONResponse(status_code=400, content={"success": False, "message": "Cannot join team after the deadline"})
-
-        matching_team = await db.find_one("teams", {"join_code": join_code})
-
-        if not matching_team:
-            result = await db.find_many("teams", {})
-            if result["status"] == 200:
-                for team in result["data"]:
-                    team_join_code = generate_team_join_code(team["team_id"], team["team_name"])
-                    if team_join_code == join_code:
-                        matching_team = team
-                        await db.update(
-                            "teams",
-                            {"team_id": team["team_id"]},
-                            {"$set": {"join_code": join_code}}
-                        )
-                        break
-
-        if not matching_team:
-            return JSONResponse(status_code=404, content={"success": False, "message": "Invalid join code"})
-
-        if len(matching_team.get("members", [])) >= 3:
-            return JSONResponse(status_code=400, content={"success": False, "message": "Team is full (maximum 3 members)"})
+                return FastJSONResponse(status_code=400, content={"success": False, "message": "Cannot join team after the deadline"})
 
         email = user.get("email")
-        if email:
-            existing_team = await db.find_one("teams", {"members.email": email})
-            if existing_team:
-                if existing_team.get("team_id") == matching_team["team_id"]:
-                    return JSONResponse(status_code=400, content={"success": False, "message": "Already a member of this team"})
-                else:
-                    return JSONResponse(status_code=400, content={"success": False, "message": "Already belongs to another team"})
-
         member = {
             "name": user.get("name"),
-            "email": user.get("email"),
+            "email": email,
             "rollNumber": user.get("rollNumber"),
             "role": user.get("role")
         }
 
-        result = await db.update(
-            "teams",
-            {"team_id": matching_team["team_id"]},
-            {"$push": {"members": member}}
-        )
-
-        if result["status"] != 200:
-            raise HTTPException(status_code=500, detail="Failed to add member to team")
-
-        updated_team = await db.find_one("teams", {"team_id": matching_team["team_id"]})
+        # Every team stores its join_code (see database/migrations.py backfill_team_codes).
+        # Capacity and membership are checked by the update filter itself so that
+        # concurrent joins cannot overfill a team; the unique members.email index
+        # rejects users who already belong to another team. Only if startup could
+        # not build that index is membership checked with an extra read.
+        if not db.index_enforced("teams.member_email_unique"):
+            if await db.exists("teams", {"members.email": email, "join_code": {"$ne": join_code}}, cache=False):
+                return FastJSONResponse(status_code=400, content={"success": False, "message": "Already belongs to another team"})
+
+        try:
+            updated_team = await db.find_one_and_update(
+                "teams",
+                {"join_code": join_code, "members.2": {"$exists": False}, "members.email": {"$ne": email}},
+                {"$push": {"members": member}}
+            )
+        except DuplicateKeyError:
+            return FastJSONResponse(status_code=400, content={"success": False, "message": "Already belongs to another team"})
 
-        if not updated_team.get("qr_id"):
-            updated_team["qr_id"] = generate_team_qr_id(updated_team["team_id"])
-        if not updated_team.get("join_code"):
-            updated_team["join_code"] = generate_team_join_code(updated_team["team_id"], updated_team["team_name"])
+        if not updated_team:
+            matching_team = await db.find_one("teams", {"join_code": join_code}, projection={"members.email": 1}, cache=False)
+            if not matching_team:
+                return FastJSONResponse(status_code=404, content={"success": False, "message": "Invalid join code"})
+            if any(m.get("email") == email for m in matching_team.get("members", [])):
+                return FastJSONResponse(status_code=400, content={"success": False, "message": "Already a member of this team"})
+            return FastJSONResponse(status_code=400, content={"success": False, "message": "Team is full (maximum 3 members)"})
 
-        return JSONResponse(status_code=200, content={"success": True, "message": "Joined team successfully", "team": updated_team})
+        return FastJSONResponse(status_code=200, content={"success": True, "message": "Joined team successfully", "team": updated_team})
 
     except HTTPException:
         raise
@@ -230,30 +355,22 @@ async def leave_team(payload: TeamAction, request: Request, user: dict = Depends
             if deadline_dt:
                 now = datetime.utcnow()
                 if now > deadline_dt:
-                    return JSONResponse(status_code=400, content={"success": False, "message": "Cannot leave team after the deadline."})
-
-        team = await db.find_one("teams", {"team_id": payload.team_id})
-        if not team:
-            raise HTTPException(status_code=404, detail="Team not found")
+                    return FastJSONResponse(status_code=400, content={"success": False, "message": "Cannot leave team after the deadline."})
 
+        # Membership is part of the update filter, so leaving is a single round trip
         email = user.get("email")
-        found = False
-
-        for m in team.get("members", []):
-            if m.get("email") == email:
-                found = True
-                break
-
-        if not found:
-            return JSONResponse(status_code=400, content={"success": False, "message": "User is not a member of this team."})
-
-        result = await db.update("teams", {"team_id": payload.team_id}, {"$pull": {"members": {"email": email}}})
-        if result["status"] != 200:
-            raise HTTPException(status_code=500, detail="Failed to remove member from team")
+        updated_team = await db.find_one_and_update(
+            "teams",
+            {"team_id": payload.team_id, "members.email": email},
+            {"$pull": {"members": {"email": email}}}
+        )
 
-        updated_team = await db.find_one("teams", {"team_id": payload.team_id})
+        if not updated_team:
+            if not await db.exists("teams", {"team_id": payload.team_id}):
+                raise HTTPException(status_code=404, detail="Team not found")
+            return FastJSONResponse(status_code=400, content={"success": False, "message": "User is not a member of this team."})
 
-        return JSONResponse(status_code=200, content={"success": True, "message": "Left team successfully.", "team": updated_team})
+        return FastJSONResponse(status_code=200, content={"success": True, "message": "Left team successfully.", "team": updated_team})
 
     except HTTPException:
         raise
@@ -262,8 +379,13 @@ async def leave_team(payload: TeamAction, request: Request, user: dict = Depends
 
 
 @router.get("/leaderboard")
-async def leaderboard_short(db = Depends(get_db)):
+async def leaderboard_short(request: Request, db = Depends(get_db), leaderboard = Depends(get_leaderboard), versions = Depends(get_versions)):
     """Return top 10 teams with name and points, sorted by points descending."""
+    etag = versions.etag("leaderboard")
+    cached = not_modified(request, etag)
+    if cached:
+        return cached
+
     if db is None:
         raise HTTPException(
             status_code=503,
@@ -271,28 +393,34 @@ async def leaderboard_short(db = Depends(get_db)):
         )
 
     try:
-        teams_collection = db.get_collection("teams")
-        teams = []
-        cursor = teams_collection.find(
-            {"points": {"$gt": 0}},
-            {"_id": 1, "team_name": 1, "points": 1}
-        ).sort("points", -1).limit(10)
-
-        async for team in cursor:
-            team["_id"] = str(team["_id"])
-            team["name"] = team.pop("team_name")
-            teams.append(team)
+        await leaderboard.ensure_loaded(db)
+        teams = leaderboard.top(10)
 
         # Return empty list format that matches volunteers structure for backwards compatibility
-        return JSONResponse(content={"volunteers": teams})
+        return FastJSONResponse(content={"volunteers": teams}, headers={"ETag": etag})
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching leaderboard: {str(e)}")
 
 
 @router.get("/leaderboard/full")
-async def leaderboard_full(db = Depends(get_db)):
-    """Return all teams with only name and points, sorted by points descending."""
+async def leaderboard_full(
+    request: Request,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_LEADERBOARD_PAGE),
+    after: Optional[str] = Query(None),
+    db = Depends(get_db),
+    leaderboard = Depends(get_leaderboard),
+    versions = Depends(get_versions)
+):
+    """
+    Return teams with only name and points, sorted by points descending.
+    With limit/after the result is a keyset page and carries the cursor of the next page.
+    """
+    etag = versions.etag("leaderboard")
+    cached = not_modified(request, etag)
+    if cached:
+        return cached
+
     if db is None:
         raise HTTPException(
             status_code=503,
@@ -300,19 +428,68 @@ async def leaderboard_full(db = Depends(get_db)):
         )
 
     try:
-        teams_collection = db.get_collection("teams")
-        teams = []
-        cursor = teams_collection.find(
-            {"points": {"$gt": 0}},
-            {"_id": 1, "team_name": 1, "points": 1}
-        ).sort("points", -1)
+        cursor = leaderboard.decode_cursor(after) if after else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    try:
+        await leaderboard.ensure_loaded(db)
 
-        async for team in cursor:
-            team["_id"] = str(team["_id"])
-            team["name"] = team.pop("team_name")
-            teams.append(team)
+        if limit is None and cursor is None:
+            if wants_ndjson(request):
+                return StreamingResponse(ndjson_stream(leaderboard.iter_all()), media_type=NDJSON_MEDIA_TYPE, headers={"ETag": etag})
+            return FastJSONResponse(content={"teams": leaderboard.all()}, headers={"ETag": etag})
 
-        return JSONResponse(content={"teams": teams})
+        teams, next_cursor = leaderboard.page(limit or DEFAULT_LEADERBOARD_PAGE, cursor)
+        return FastJSONResponse(content={"teams": teams, "next": next_cursor}, headers={"ETag": etag})
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching teams: {str(e)}")
+
+
+@router.get("/leaderboard/stream")
+async def leaderboard_stream(db = Depends(get_db), leaderboard = Depends(get_leaderboard), broadcaster = Depends(get_broadcaster), versions = Depends(get_versions)):
+    """
+    Stream leaderboard updates as Server-Sent Events: a snapshot on connect,
+    then a score event with rank and point deltas for every award.
+    """
+    try:
+        await leaderboard.ensure_loaded(db)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching leaderboard: {str(e)}")
+
+    # Only the generator subscribes, so a client gone before the body starts never holds a slot
+    if not broadcaster.admit():
+        raise HTTPException(status_code=503, detail="Too many leaderboard viewers, retry later", headers={"Retry-After": "30"})
+
+    def snapshot():
+        # Shared by every client connecting or catching up at the same leaderboard version
+        return broadcaster.snapshot(versions.version("leaderboard"), lambda: {"teams": leaderboard.all()})
+
+    async def events():
+        subscription = broadcaster.subscribe()
+        if subscription is None:
+            # Filled up by clients that connected since the check
+            return
+        try:
+            yield "retry: 5000\n\n" + snapshot()
+            while True:
+                message = await broadcaster.next_message(subscription, LEADERBOARD_STREAM_HEARTBEAT_SECONDS)
+                if broadcaster.is_closed(message):
+                    break
+                if subscription.lagged:
+                    # The backlog was dropped; a snapshot supersedes it
+                    subscription.lagged = False
+                    yield snapshot()
+                elif message is None:
+                    yield ": heartbeat\n\n"
+                else:
+                    yield message
+        finally:
+            broadcaster.unsubscribe(subscription)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -1,19 +1,18 @@
 from fastapi import APIRouter, Request, HTTPException, Depends
-from fastapi.responses import JSONResponse
-from pydantic import BaseModel
-from jose import jwt, JWTError
-from datetime import datetime, timedelta
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, ValidationError
+from datetime import datetime
 
 from config.config import SECRET_KEY
 from database.DB import get_db
-from .dependencies import get_current_user, require_admin, require_admin_or_volunteer
+from .dependencies import get_current_user, require_admin, require_admin_or_volunteer, get_token_verifier, list_read
 from helpers.SecretCodeEncryptionStrategy import SecretCodeEncryptionStrategy
+from helpers.NDJSONStream import NDJSON_MEDIA_TYPE, wants_ndjson, ndjson_stream
+from helpers.FastJSONResponse import FastJSONResponse
+from helpers.BulkImport import read_import_rows, validation_error, count_statuses
 
 router = APIRouter()
 
-ALGORITHM = "HS256"
-TOKEN_EXPIRE_MINUTES = 180
-
 # Helper instances for encryption/decryption
 _secret_code_strategy = SecretCodeEncryptionStrategy(SECRET_KEY)
 
@@ -23,23 +22,6 @@ def decrypt_secret_code(encrypted_text: str) -> str:
     return _secret_code_strategy.decrypt(encrypted_text)
 
 
-def create_volunteer_token(volunteer_email: str, event_id: str):
-    payload = {
-        "sub": volunteer_email,
-        "event_id": event_id,
-        "exp": datetime.utcnow() + timedelta(minutes=TOKEN_EXPIRE_MINUTES)
-    }
-    return jwt.encode(payload, SECRET_KEY, algorithm=ALGORITHM)
-
-
-def verify_volunteer_token(token: str):
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        return payload
-    except JWTError:
-        return None
-
-
 # Pydantic models
 class VolunteerCreate(BaseModel):
     rollNumber: str
@@ -56,8 +38,7 @@ class VolunteerEventAuth(BaseModel):
 async def add_volunteer(volunteer_data: VolunteerCreate, request: Request, admin_user: dict = Depends(require_admin), db = Depends(get_db)):
     """Add a new volunteer (Admin only)"""
     try:
-        existing_volunteer = await db.find_one("volunteers", {"rollNumber": volunteer_data.rollNumber})
-        if existing_volunteer:
+        if await db.exists("volunteers", {"rollNumber": volunteer_data.rollNumber}):
             raise HTTPException(status_code=400, detail="Volunteer with this roll number already exists")
 
         volunteer = {
@@ -68,7 +49,7 @@ async def add_volunteer(volunteer_data: VolunteerCreate, request: Request, admin
 
         result = await db.add("volunteers", volunteer)
         if result["status"] == 200:
-            return JSONResponse(content={"message": "Volunteer added successfully", "volunteer": result["data"]})
+            return FastJSONResponse(content={"message": "Volunteer added successfully", "volunteer": result["data"]})
         else:
             raise HTTPException(status_code=500, detail="Failed to add volunteer")
 
@@ -78,14 +59,68 @@ async def add_volunteer(volunteer_data: VolunteerCreate, request: Request, admin
         raise HTTPException(status_code=500, detail=f"Error adding volunteer: {str(e)}")
 
 
+@router.post('/bulk')
+async def bulk_add_volunteers(request: Request, admin_user: dict = Depends(require_admin), db = Depends(get_db)):
+    """
+    Add or update many volunteers from a CSV (rollNumber,name,email) or JSON body (Admin only).
+    Volunteers are matched on rollNumber; the response reports the outcome of every row.
+    """
+    try:
+        rows = await read_import_rows(request)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+    try:
+        results = [None] * len(rows)
+        volunteers = []
+        positions = []
+        seen_rolls, seen_emails = set(), set()
+        for index, row in enumerate(rows):
+            try:
+                volunteer_data = VolunteerCreate(**row)
+            except ValidationError as e:
+                results[index] = {"row": index + 1, "status": "invalid", "error": validation_error(e)}
+                continue
+            # Two upserts of the same volunteer in one unordered bulk_write would race each other
+            if volunteer_data.rollNumber in seen_rolls or volunteer_data.email.lower() in seen_emails:
+                results[index] = {"row": index + 1, "rollNumber": volunteer_data.rollNumber, "status": "invalid",
+                                  "error": "Volunteer appears more than once in the import"}
+                continue
+            seen_rolls.add(volunteer_data.rollNumber)
+            seen_emails.add(volunteer_data.email.lower())
+            volunteers.append(volunteer_data.model_dump())
+            positions.append(index)
+
+        if volunteers:
+            now = datetime.utcnow()
+            result = await db.bulk_upsert(
+                "volunteers",
+                volunteers,
+                ["rollNumber"],
+                set_on_insert=lambda volunteer: {"added_at": now, "added_by": admin_user["email"]}
+            )
+            for index, outcome in zip(positions, result["results"]):
+                outcome.pop("index")
+                results[index] = {"row": index + 1, "rollNumber": rows[index].get("rollNumber"), **outcome}
+
+        return FastJSONResponse(content={"message": f"Processed {len(rows)} volunteers", "counts": count_statuses(results), "results": results})
+
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error importing volunteers: {str(e)}")
+
+
 @router.get('')
 async def get_volunteers(request: Request, user: dict = Depends(require_admin_or_volunteer), db = Depends(get_db)):
     """Get all volunteers (Admin and Volunteer access)"""
     try:
-        result = await db.find_many("volunteers")
+        read = list_read(user)
+        if wants_ndjson(request):
+            return StreamingResponse(ndjson_stream(db.iter_many("volunteers", read=read["read"])), media_type=NDJSON_MEDIA_TYPE)
+
+        result = await db.find_many("volunteers", **read)
         volunteers = result["data"] if result["status"] == 200 else []
 
-        return JSONResponse(content={"volunteers": volunteers})
+        return FastJSONResponse(content={"volunteers": volunteers})
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching volunteers: {str(e)}")
@@ -99,7 +134,7 @@ async def remove_volunteer(roll_number: str, request: Request, admin_user: dict
         if result["deleted_count"] == 0:
             raise HTTPException(status_code=404, detail="Volunteer not found")
 
-        return JSONResponse(content={"message": "Volunteer removed successfully"})
+        return FastJSONResponse(content={"message": "Volunteer removed successfully"})
 
     except HTTPException:
         raise
@@ -115,7 +150,7 @@ async def get_volunteer(roll_number: str, request: Request, user: dict = Depends
         if not volunteer:
             raise HTTPException(status_code=404, detail="Volunteer not found")
 
-        return JSONResponse(content={"volunteer": volunteer})
+        return FastJSONResponse(content={"volunteer": volunteer})
 
     except HTTPException:
         raise
@@ -127,7 +162,8 @@ async def get_volunteer(roll_number: str, request: Request, user: dict = Depends
 async def authorize_volunteer(
     request: Request,
     user=Depends(require_admin_or_volunteer),
-    db = Depends(get_db)
+    db = Depends(get_db),
+    token_verifier = Depends(get_token_verifier)
 ):
     """
     Authorize a logged-in volunteer for an event using secret code.
@@ -149,7 +185,8 @@ async def authorize_volunteer(
     email = user["email"]
     role = user["role"]
 
-    event = await db.find_one("events", {"event_id": event_id})
+    # Read past the event cache so a rotated secret code stops authorizing on every worker at once
+    event = await db.find_one("events", {"event_id": event_id}, cache=False)
     if not event:
         raise HTTPException(status_code=404, detail="Event not found")
 
@@ -162,7 +199,7 @@ async def authorize_volunteer(
     if decrypted_code != event.get("secret_code"):
         raise HTTPException(status_code=401, detail="Invalid secret code")
 
-    token = create_volunteer_token(email, event_id)
+    token = token_verifier.create(email, event_id)
     return {
         "message": f"Authorization successful for event '{event['event_name']}'",
         "volunteer_email": email,
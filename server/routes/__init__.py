@@ -3,5 +3,6 @@ from . import EventRouter
 from . import VolunteerRouter
 from . import AttendanceRouter
 from . import TeamRouter
+from . import MetricsRouter
 
-__all__ = ['AuthRouter', 'EventRouter', 'VolunteerRouter', 'AttendanceRouter', 'TeamRouter']
+__all__ = ['AuthRouter', 'EventRouter', 'VolunteerRouter', 'AttendanceRouter', 'TeamRouter', 'MetricsRouter']
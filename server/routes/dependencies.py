@@ -2,7 +2,7 @@
 Shared dependency functions for FastAPI routers.
 Eliminates code duplication across multiple router files.
 """
-from fastapi import Request, HTTPException, Depends
+from fastapi import Request, Response, HTTPException, Depends
 
 
 async def get_current_user(request: Request):
@@ -34,3 +34,40 @@ async def require_admin_or_volunteer(user: dict = Depends(get_current_user)):
     if user.get("role") not in ["admin", "volunteer"]:
         raise HTTPException(status_code=403, detail="Admin or volunteer access required")
     return user
+
+
+def get_versions(request: Request):
+    """Dependency to get the resource version counters from app state"""
+    return request.app.state.versions
+
+
+def get_token_verifier(request: Request):
+    """Dependency to get the volunteer event token verifier from app state"""
+    return request.app.state.token_verifier
+
+
+def get_broadcaster(request: Request):
+    """Dependency to get the leaderboard Server-Sent Events broadcaster from app state"""
+    return request.app.state.broadcaster
+
+
+def list_read(user: dict):
+    """
+    find_many options for the list endpoints. Admins read the primary, uncached,
+    so a list fetched right after their own write shows it; everyone else polls
+    secondaries through the query cache.
+    """
+    if user.get("role") == "admin":
+        return {"read": "primary", "cache": False}
+    return {"read": "secondary", "cache": True}
+
+
+def not_modified(request: Request, etag: str):
+    """
+    Return a 304 response if the client's If-None-Match matches the ETag, else None.
+    Called before the resource itself is read, so unchanged polls cost at most
+    a cached version lookup.
+    """
+    if request.app.state.versions.matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    return None
@@ -1,8 +1,13 @@
 """
 Simple pytest configuration
 """
+import os
 import pytest
 from fastapi.testclient import TestClient
+
+# Run against the in-memory storage engine unless a real database is configured
+os.environ.setdefault("MONGO_URI", "memory://")
+
 from main import app
 
 